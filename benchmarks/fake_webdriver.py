@@ -0,0 +1,264 @@
+import base64
+import json
+import re
+import threading
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+PNG = base64.b64encode(
+    bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+        "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+    )
+).decode("ascii")
+ROUTES = [
+    (method, re.compile("^" + pattern + "$"), name)
+    for method, pattern, name in [
+        ("POST", "/session", "newSession"),
+        ("DELETE", "/session/[^/]+", "deleteSession"),
+        ("POST", "/session/[^/]+/url", "get"),
+        ("GET", "/session/[^/]+/url", "getCurrentUrl"),
+        ("POST", "/session/[^/]+/refresh", "refresh"),
+        ("POST", "/session/[^/]+/timeouts", "setTimeouts"),
+        ("GET", "/session/[^/]+/window/handles", "getWindowHandles"),
+        ("GET", "/session/[^/]+/window", "getWindowHandle"),
+        ("POST", "/session/[^/]+/window", "switchToWindow"),
+        ("GET", "/session/[^/]+/window/rect", "getWindowRect"),
+        ("POST", "/session/[^/]+/window/rect", "setWindowRect"),
+        ("POST", "/session/[^/]+/frame", "switchToFrame"),
+        ("DELETE", "/session/[^/]+/cookie", "deleteAllCookies"),
+        ("GET", "/session/[^/]+/screenshot", "screenshot"),
+        ("POST", "/session/[^/]+/execute/sync", "executeScript"),
+        ("POST", "/session/[^/]+/execute/async", "executeAsyncScript"),
+        ("POST", "/session/[^/]+/element", "findElement"),
+        ("POST", "/session/[^/]+/elements", "findElements"),
+        ("POST", "/session/[^/]+/element/(?P<id>[^/]+)/element", "findChildElement"),
+        ("POST", "/session/[^/]+/element/(?P<id>[^/]+)/elements", "findChildElements"),
+        ("GET", "/session/[^/]+/element/(?P<id>[^/]+)/text", "getElementText"),
+        ("GET", "/session/[^/]+/element/(?P<id>[^/]+)/enabled", "isElementEnabled"),
+        ("POST", "/session/[^/]+/element/(?P<id>[^/]+)/click", "elementClick"),
+        ("POST", "/session/[^/]+/element/(?P<id>[^/]+)/clear", "elementClear"),
+        ("POST", "/session/[^/]+/element/(?P<id>[^/]+)/value", "elementSendKeys"),
+    ]
+]
+
+
+def element(text="", displayed=True, children=None):
+    """
+    Build fake DOM element
+    :param text: element text
+    :param displayed: element visibility
+    :param children: dict with selector value and list of child elements
+    :return: dict with element state
+    """
+    return {"text": text, "displayed": displayed, "children": children or {}}
+
+
+def jobs_page(cards=20):
+    """
+    Fake DOM of the jobs page with a list of job cards
+    :param cards: number of job cards
+    :return: dict with selector value and list of elements
+    """
+    return {
+        "input[name='search_text']": [element()],
+        "button.c-search-submit": [element("Find jobs")],
+        ".qa-job-container": [
+            element(
+                "Job {}".format(index),
+                children={".qa-store-address": [element("{} Main St".format(index))]},
+            )
+            for index in range(cards)
+        ],
+        ".qa-store-address": [element("{} Main St".format(index)) for index in range(cards)],
+    }
+
+
+class FakeWebDriver:
+    """
+    In-process W3C WebDriver stub: serves a static fake DOM and counts every command received
+    """
+
+    def __init__(self, page=None):
+        """
+        Constructor fake webdriver
+        :param page: dict with selector value and list of elements, jobs page by default
+        """
+        self.page = page or jobs_page()
+        self.commands = Counter()
+        self._elements = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """
+        Command executor url
+        :return: string
+        """
+        return "http://127.0.0.1:{}".format(self._server.server_port)
+
+    def start(self):
+        """
+        Start serving in a background thread
+        :return: self
+        """
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop server
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        """
+        Forget counted commands
+        """
+        self.commands.clear()
+
+    def _ref(self, elem):
+        """
+        Get W3C element reference registering the element
+        :param elem: fake element
+        :return: dict with element reference
+        """
+        key = "{}".format(id(elem))
+        self._elements[key] = elem
+        return {ELEMENT_KEY: key}
+
+    def _find(self, root, body):
+        """
+        Find elements by selector value
+        :param root: dict with selector value and elements
+        :param body: request body with using and value
+        :return: list of elements
+        """
+        return root.get(body["value"], [])
+
+    def _read(self, elem, attributes):
+        """
+        Record returned by the bulk read script
+        :param elem: fake element
+        :param attributes: attribute names
+        :return: dict record
+        """
+        return {
+            "element": self._ref(elem),
+            "text": elem["text"] if elem["displayed"] else "",
+            "displayed": elem["displayed"],
+            "attributes": {name: None for name in attributes},
+        }
+
+    def _execute(self, body):
+        """
+        Emulate the scripts the framework runs
+        :param body: request body with script and args
+        :return: script result
+        """
+        script, args = body["script"], body["args"]
+        if "function read(" in script:
+            locator, attributes, children = args
+            records = []
+            for elem in self.page.get(locator[1], []):
+                record = self._read(elem, attributes)
+                record["children"] = {
+                    name: (
+                        self._read(elem["children"][child[1]][0], attributes)
+                        if elem["children"].get(child[1])
+                        else None
+                    )
+                    for name, child in children.items()
+                }
+                records.append(record)
+            return records
+        if "MutationObserver" in script:
+            condition, locator, target = args[0], args[1], args[2]
+            found = self.page.get(locator[1], []) if locator else []
+            if condition == "invisible":
+                return True if target or not found else not found[0]["displayed"]
+            return self._ref(found[0]) if found else None
+        if args and isinstance(args[0], dict) and ELEMENT_KEY in args[0]:
+            # selenium isDisplayed atom, minified so it is matched by its single element argument
+            return self._elements[args[0][ELEMENT_KEY]]["displayed"]
+        return None
+
+    def dispatch(self, method, path, body):
+        """
+        Answer a command
+        :param method: http method
+        :param path: request path
+        :param body: parsed request body
+        :return: tuple with status and W3C value
+        """
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            return 404, {"error": "unknown command", "message": path, "stacktrace": ""}
+        self.commands[name] += 1
+        elem = self._elements.get(match.groupdict().get("id", ""))
+        if name == "newSession":
+            capabilities = {"browserName": "chrome", "browserVersion": "fake"}
+            return 200, {"sessionId": uuid.uuid4().hex, "capabilities": capabilities}
+        if name in ("findElement", "findChildElement"):
+            found = self._find(elem["children"] if elem else self.page, body)
+            if not found:
+                return 404, {"error": "no such element", "message": "", "stacktrace": ""}
+            return 200, self._ref(found[0])
+        if name in ("findElements", "findChildElements"):
+            found = self._find(elem["children"] if elem else self.page, body)
+            return 200, [self._ref(item) for item in found]
+        if name in ("executeScript", "executeAsyncScript"):
+            return 200, self._execute(body)
+        values = {
+            "getElementText": elem and elem["text"],
+            "isElementEnabled": True,
+            "screenshot": PNG,
+            "getWindowRect": {"x": 0, "y": 0, "width": 1440, "height": 1024},
+            "getWindowHandle": "main",
+            "getWindowHandles": ["main"],
+            "getCurrentUrl": "http://fake/",
+        }
+        return 200, values.get(name)
+
+    def _handler(self):
+        """
+        Build request handler bound to this fake driver
+        :return: handler class
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Fake webdriver request handler
+            """
+
+            def _respond(self):
+                """
+                Dispatch request and write json response
+                """
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                status, value = fake.dispatch(self.command, self.path, body)
+                payload = json.dumps({"value": value}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, *args):
+                """
+                Silence request logs
+                :param args: log arguments
+                """
+
+        return Handler
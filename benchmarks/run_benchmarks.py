@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from loguru import logger
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from utils.check import Check
+from utils.constants import BASE_DIR
+from utils.screenshot import screenshots
+from web.base_screen import BaseScreen
+from web.pages.jobs_page import JobsPage
+
+BASELINE = os.path.join(BASE_DIR, "benchmarks", "baselines", "baseline.json")
+RESULTS = os.path.join(BASE_DIR, "output", "benchmarks.json")
+SEARCH = (By.CSS_SELECTOR, "input[name='search_text']")
+BUTTON = (By.CSS_SELECTOR, "button.c-search-submit")
+JOBS = (By.CSS_SELECTOR, ".qa-job-container")
+ADDRESS = (By.CSS_SELECTOR, ".qa-store-address")
+
+
+def raw_address_list(driver):
+    """
+    Raw selenium version of the job address check, one find, text and is_displayed per card
+    :param driver: webdriver object
+    :return: boolean
+    """
+    flags = []
+    for job in driver.find_elements(*JOBS):
+        address = job.find_element(*ADDRESS)
+        _ = address.text
+        flags.append(address.is_displayed())
+    return all(flags)
+
+
+def take_screenshot(base):
+    """
+    Framework screenshot including the background save
+    :param base: BaseScreen
+    """
+    screenshots.start_test()
+    base.take_screenshot()
+    screenshots.flush()
+
+
+def get_operations(driver):
+    """
+    Benchmarked operations, each framework operation is paired with its raw selenium version
+    :param driver: webdriver object
+    :return: dict with operation name and tuple of callable and raw operation name
+    """
+    base, jobs, check = BaseScreen(), JobsPage(), Check()
+    return {
+        "raw.find_element": (lambda: driver.find_element(*SEARCH), None),
+        "raw.click": (lambda: driver.find_element(*BUTTON).click(), None),
+        "raw.send_keys": (lambda: _raw_send_keys(driver), None),
+        "raw.is_displayed": (lambda: driver.find_element(*SEARCH).is_displayed(), None),
+        "raw.screenshot": (driver.get_screenshot_as_base64, None),
+        "raw.address_list": (lambda: raw_address_list(driver), None),
+        "base._get_element": (lambda: base._get_element(SEARCH), "raw.find_element"),
+        "base._click_on_element": (lambda: base._click_on_element(BUTTON), "raw.click"),
+        "base._send_text": (lambda: base._send_text(SEARCH, "Busser"), "raw.send_keys"),
+        "base._is_element_displayed": (
+            lambda: base._is_element_displayed(SEARCH),
+            "raw.is_displayed",
+        ),
+        "base.take_screenshot": (lambda: take_screenshot(base), "raw.screenshot"),
+        "check.is_true": (lambda: check.is_true(True, "benchmark"), None),
+        "jobs.is_jobs_page_displayed": (jobs.is_jobs_page_displayed, None),
+        "jobs.search_and_find": (
+            lambda: (jobs.search_position("Busser"), jobs.click_on_find_jobs()),
+            None,
+        ),
+        "jobs.are_address_present_on_list": (
+            jobs.are_address_present_on_list,
+            "raw.address_list",
+        ),
+    }
+
+
+def _raw_send_keys(driver):
+    """
+    Raw selenium clear and send keys
+    :param driver: webdriver object
+    """
+    element = driver.find_element(*SEARCH)
+    element.clear()
+    element.send_keys("Busser")
+
+
+def measure(fake, func, iterations, warmup=3):
+    """
+    Measure latency, webdriver commands and allocations of an operation
+    :param fake: FakeWebDriver
+    :param func: operation
+    :param iterations: number of measured runs
+    :param warmup: number of runs before measuring
+    :return: dict with results
+    """
+    for _ in range(warmup):
+        func()
+    fake.reset_counts()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    commands = sum(fake.commands.values()) / iterations
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(iterations, 10)):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "commands": round(commands, 2),
+        "alloc_kb": round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+def run(iterations):
+    """
+    Run every operation against the fake webdriver
+    :param iterations: number of measured runs per operation
+    :return: dict with operation name and results
+    """
+    fake = FakeWebDriver().start()
+    driver = webdriver.Remote(command_executor=fake.url, options=webdriver.ChromeOptions())
+    BaseScreen._driver = driver
+    screenshots.file_dir = tempfile.mkdtemp()
+    try:
+        operations = get_operations(driver)
+        results = {name: measure(fake, func, iterations) for name, (func, _) in operations.items()}
+        for name, (_, raw) in operations.items():
+            if raw:
+                results[name]["overhead"] = round(
+                    results[name]["p50_ms"] / max(results[raw]["p50_ms"], 1e-6), 2
+                )
+        return results
+    finally:
+        driver.quit()
+        fake.stop()
+
+
+def compare(results, baseline, latency_tolerance, alloc_tolerance):
+    """
+    Compare results with baseline, command counts must not grow, overhead ratio against raw
+    selenium and allocations must stay within tolerance
+    :param results: current results
+    :param baseline: baseline results
+    :param latency_tolerance: allowed relative growth of overhead ratio
+    :param alloc_tolerance: allowed relative growth of allocations
+    :return: list of regression messages
+    """
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["commands"] > base["commands"]:
+            regressions.append(
+                "{}: commands {} > {}".format(name, current["commands"], base["commands"])
+            )
+        if "overhead" in base and current["overhead"] > base["overhead"] * (1 + latency_tolerance):
+            regressions.append(
+                "{}: overhead {}x > {}x".format(name, current["overhead"], base["overhead"])
+            )
+        if current["alloc_kb"] > base["alloc_kb"] * (1 + alloc_tolerance) + 1:
+            regressions.append(
+                "{}: allocations {}KB > {}KB".format(name, current["alloc_kb"], base["alloc_kb"])
+            )
+    return regressions
+
+
+def print_table(results):
+    """
+    Print results table
+    :param results: dict with operation name and results
+    """
+    print(
+        "{:<36}{:>10}{:>10}{:>10}{:>11}{:>10}".format(
+            "operation", "p50 ms", "p95 ms", "commands", "alloc KB", "overhead"
+        )
+    )
+    for name, result in results.items():
+        print(
+            "{:<36}{:>10}{:>10}{:>10}{:>11}{:>10}".format(
+                name,
+                result["p50_ms"],
+                result["p95_ms"],
+                result["commands"],
+                result["alloc_kb"],
+                result.get("overhead", ""),
+            )
+        )
+
+
+def main(argv=None):
+    """
+    Run framework overhead benchmarks
+    :param argv: command line arguments
+    :return: exit code, 1 if there are regressions against the baseline
+    """
+    parser = argparse.ArgumentParser(description="Framework overhead benchmarks")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    logger.remove()
+    logger.add(lambda message: None, level="TRACE")
+    results = run(args.iterations)
+    print_table(results)
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Baseline updated {}".format(BASELINE))
+        return 0
+    if not os.path.exists(BASELINE):
+        print("There is no baseline, run with --update-baseline")
+        return 0
+    with open(BASELINE) as f:
+        regressions = compare(results, json.load(f), args.latency_tolerance, args.alloc_tolerance)
+    for regression in regressions:
+        print("REGRESSION {}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,65 @@
-import re
-import subprocess
-
 from utils.common import get_env_var
 from utils.constants import ACTIVITY, ANDROID, IOS, PACKAGE
+from utils.devices import devices
+from utils.run_config import get_run_config
 
 
-def execute_command(command):
-    """
-    Execute shell command
-    :param command: to run
-    :return: result of command execution
-    """
-    return subprocess.run(command, stdout=subprocess.PIPE).stdout.decode("utf-8")
-
-
-def get_android_caps():
+def get_android_caps(lease=None):
     """
     Get Android capabilities for appium
+    :param lease: DeviceLease given by the device pool, if None UDID or first device is used
     :return: dict with capabilities
     """
-    device_name, device_version = get_android_device_info()
-    return {
+    device = lease.device if lease else devices.get_device(ANDROID, get_env_var("UDID"))
+    caps = {
         "platformName": ANDROID,
-        "platformVersion": device_version,
-        "deviceName": device_name,
+        "platformVersion": device.os_version,
+        "deviceName": device.model,
+        "udid": device.serial,
         "automationName": "UiAutomator2",
         "app": get_env_var("ANDROID_PATH"),
         "appPackage": PACKAGE,
         "appActivity": ACTIVITY,
     }
+    if lease:
+        caps["systemPort"] = lease.system_port
+    return caps
 
 
-def get_ios_caps():
+def get_ios_caps(lease=None):
     """
     Get IOS capabilities for appium
+    :param lease: DeviceLease given by the device pool, if None UDID is used
     :return: dict with capabilities
     """
-    device_name, device_version = get_ios_device_info()
-    return {
+    if lease:
+        device_name, device_version = lease.device.model, lease.device.os_version
+    else:
+        device_name, device_version = get_ios_device_info()
+    caps = {
         "platformName": IOS,
         "platformVersion": device_version,
         "deviceName": device_name,
-        "udid": get_env_var("UDID"),
+        "udid": lease.device.serial if lease else get_env_var("UDID"),
         "automationName": "XCUITest",
         "app": get_env_var("IOS_PATH"),
         "bundleId": get_env_var("BUNDLE_ID"),
     }
+    if lease:
+        caps["wdaLocalPort"] = lease.system_port
+    return caps
 
 
-def get_capabilities():
+def get_capabilities(lease=None):
     """
     Get capabilities
+    :param lease: DeviceLease given by the device pool
     :return: Dict
     """
-    if get_env_var("EXECUTE_ON").lower() == IOS:
-        return get_ios_caps()
+    if get_run_config().execute_on == IOS:
+        return get_ios_caps(lease)
     else:
-        return get_android_caps()
+        return get_android_caps(lease)
 
 
 def get_ios_device_info():
@@ -65,14 +68,8 @@ def get_ios_device_info():
     :return: device name and version
     """
     # TODO add logic for real device
-    devices_list = execute_command(["xcrun", "xctrace", "list", "devices"]).splitlines()
-    try:
-        device_info = [device for device in devices_list if get_env_var("UDID") in device]
-        device_version = re.findall(r"-?\d+\.?\d*\.?\d*", device_info[0].split(")")[0])[-1]
-        device_name = device_info[0].split(" (")[0]
-        return device_name, device_version
-    except Exception as error:
-        raise TypeError("The provided UDID doesnt exists or: {}".format(error))
+    device = devices.get_device(IOS, get_env_var("UDID"))
+    return device.model, device.os_version
 
 
 def get_android_device_info():
@@ -80,8 +77,5 @@ def get_android_device_info():
     Get Android device info like device name and version
     :return: device name and version
     """
-    device_name = execute_command(["adb", "devices"])
-    device_version = execute_command(["adb", "shell", "getprop ro.build.version.release"])
-    if not device_name:
-        raise TypeError("There is no device connected")
-    return device_name, device_version
+    device = devices.get_device(ANDROID, get_env_var("UDID"))
+    return device.model, device.os_version
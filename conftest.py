@@ -1,14 +1,118 @@
+import asyncio
+import inspect
+
 import pytest
 from _pytest.fixtures import fixture
 from loguru import logger as log
+from selenium.common.exceptions import WebDriverException
 
+from service.async_base_api import AsyncBaseAPI
 from service.xray import XrayAPI
+from service.xray_collector import WORKER_OUTPUT_KEY, collector, is_batch_mode
+from utils.browser_profile import WORKER_OUTPUT_KEY as PAGE_LOADS_OUTPUT_KEY
+from utils.browser_profile import page_loads
+from utils.command_profiler import WORKER_OUTPUT_KEY as PROFILE_OUTPUT_KEY
+from utils.command_profiler import profiler
 from utils.common import get_current_time
 from utils.constants import XRAY_DATE
+from utils.device_pool import device_pool
+from utils.devices import devices
 from utils.driver import Driver
+from utils.driver_pool import (
+    DriverPool,
+    close_driver_pool,
+    get_driver_pool,
+    is_pool_enabled,
+)
+from utils.durations import DurationHistory
+from utils.metrics import WORKER_OUTPUT_KEY as METRICS_OUTPUT_KEY
+from utils.metrics import metrics
+from utils.network_cache import WORKER_OUTPUT_KEY as NETWORK_OUTPUT_KEY
+from utils.network_cache import network
+from utils.run_config import WORKER_INPUT_KEY, RunConfig, get_run_config, set_run_config
+from utils.screenshot import screenshots
+from utils.webdriver_transport import transport
 from web.base_screen import BaseScreen
 
 driver = Driver()
+durations = None
+
+
+def pytest_addoption(parser):
+    """
+    Pytest method to add command line options, they take precedence over env variables
+    :param parser: pytest parser
+    """
+    parser.addoption("--env", action="store", default=None, help="dev, qa or uat")
+    parser.addoption("--browser", action="store", default=None, help="chrome or firefox")
+    parser.addoption("--headless", action="store", default=None, help="1 or 0")
+
+
+def pytest_configure(config):
+    """
+    Pytest method to parse and validate run configuration once at session start,
+    xdist workers receive the one parsed by the controller
+    :param config: pytest config
+    """
+    if hasattr(config, "workerinput"):
+        run_config = RunConfig.from_dict(config.workerinput[WORKER_INPUT_KEY])
+    else:
+        run_config = RunConfig.from_env(
+            env=config.getoption("--env"),
+            browser=config.getoption("--browser"),
+            headless=config.getoption("--headless"),
+        )
+    set_run_config(run_config)
+    screenshots.configure(run_config)
+    transport.configure(run_config)
+    metrics.configure(run_config)
+    profiler.configure(run_config)
+    page_loads.configure(run_config)
+    network.configure(run_config)
+    if not hasattr(config, "workerinput"):
+        global durations
+        durations = DurationHistory(run_config.env)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+    Xdist method called before starting a worker, sends run configuration to it
+    :param node: xdist worker node
+    """
+    node.workerinput[WORKER_INPUT_KEY] = get_run_config().to_dict()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """
+    Xdist method to create the scheduler, load distribution uses recorded test durations
+    :param config: pytest config
+    :param log: xdist log producer
+    :return: scheduler or None to use the xdist default one
+    """
+    if config.getoption("dist") == "load":
+        from utils.scheduling import DurationScheduling
+
+        return DurationScheduling(config, log, history=durations)
+
+
+def pytest_runtest_setup(item):
+    """
+    Pytest method called before test setup, attributes next metrics and commands to the test
+    :param item: test item
+    """
+    metrics.start_test(item.nodeid)
+    profiler.start_test(item.nodeid)
+
+
+def pytest_runtest_logreport(report):
+    """
+    Pytest method called for every test phase report, records test durations on the controller
+    :param report: test report
+    """
+    if durations:
+        durations.add_report(report)
 
 
 def send_xray_results(start, request):
@@ -19,8 +123,12 @@ def send_xray_results(start, request):
     """
     result = request.node.rep_call
     if result.outcome == "failed":
-        BaseScreen().take_screenshot()
-    XrayAPI().send_xray_results(start, get_current_time(formatter=XRAY_DATE), result)
+        BaseScreen().take_screenshot(final=True)
+    end = get_current_time(formatter=XRAY_DATE)
+    if is_batch_mode():
+        collector.add(start, end, result)
+    else:
+        XrayAPI().send_xray_results(start, end, result)
 
 
 @fixture()
@@ -30,15 +138,26 @@ def mobile_setup(request):
     """
     log.info("Starting Mobile Setup")
     start = get_current_time(formatter=XRAY_DATE)
-    mobile_driver = BaseScreen._driver = driver.init_mobile_driver()
+    screenshots.start_test()
+    lease = device_pool.acquire() if get_run_config().device_pool else None
+    try:
+        mobile_driver = BaseScreen._driver = driver.init_mobile_driver(lease)
+    except WebDriverException:
+        devices.invalidate()
+        device_pool.release()
+        raise
     yield
     log.info("Mobile teardown")
-    send_xray_results(start, request)
-    mobile_driver.quit()
+    try:
+        send_xray_results(start, request)
+        screenshots.flush()
+        mobile_driver.quit()
+    finally:
+        device_pool.release()
 
 
 @pytest.hookimpl(hookwrapper=True, tryfirst=True)
-def pytest_runtest_make_report(item):
+def pytest_runtest_makereport(item):
     """
     Pytest method to get failures
     :param item: test item
@@ -48,6 +167,29 @@ def pytest_runtest_make_report(item):
     setattr(item, "rep_call", rep)
 
 
+@fixture()
+def async_api():
+    """
+    Async API client using base url from test data
+    :return: AsyncBaseAPI
+    """
+    return AsyncBaseAPI()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Pytest method to run async def test cases on their own event loop
+    :param pyfuncitem: test function item
+    :return: True if test was run here
+    """
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        names = inspect.signature(pyfuncitem.obj).parameters
+        funcargs = {name: value for name, value in pyfuncitem.funcargs.items() if name in names}
+        asyncio.run(pyfuncitem.obj(**funcargs))
+        return True
+
+
 @fixture(scope="function")
 def web_setup(request):
     """
@@ -56,8 +198,62 @@ def web_setup(request):
     """
     log.info("Web setup")
     start = get_current_time(formatter=XRAY_DATE)
-    BaseScreen._driver = web_driver = driver.init_driver()
+    screenshots.start_test()
+    transport.start_test(request.node.nodeid)
+    pooled = is_pool_enabled()
+    if pooled:
+        web_driver = get_driver_pool(driver.init_driver).acquire()
+    else:
+        web_driver = driver.init_driver()
+    BaseScreen._driver = web_driver
     yield
     log.info("Web teardown")
-    send_xray_results(start, request)
-    web_driver.quit()
+    try:
+        send_xray_results(start, request)
+        screenshots.flush()
+    finally:
+        if pooled:
+            crashed = request.node.rep_call.failed and not DriverPool.is_alive(web_driver)
+            get_driver_pool(driver.init_driver).release(web_driver, crashed=crashed)
+        else:
+            web_driver.quit()
+        transport.finish_test()
+
+
+def pytest_sessionfinish(session):
+    """
+    Pytest method called after whole test run finished
+    :param session: pytest session
+    """
+    close_driver_pool()
+    device_pool.release()
+    screenshots.shutdown()
+    if hasattr(session.config, "workerinput"):
+        session.config.workeroutput[WORKER_OUTPUT_KEY] = collector.results
+        session.config.workeroutput[METRICS_OUTPUT_KEY] = metrics.samples
+        session.config.workeroutput[PROFILE_OUTPUT_KEY] = profiler.tests
+        session.config.workeroutput[PAGE_LOADS_OUTPUT_KEY] = page_loads.durations
+        session.config.workeroutput[NETWORK_OUTPUT_KEY] = network.stats.counts
+    else:
+        collector.send()
+        durations.save()
+        metrics.save()
+        profiler.save()
+        page_loads.save()
+        network.stats.save()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Xdist method called when a worker finished, merges its xray results, metrics,
+    command profile, page load times and network stats
+    :param node: xdist worker node
+    :param error: worker error if any
+    """
+    workeroutput = getattr(node, "workeroutput", {})
+    collector.extend(workeroutput.get(WORKER_OUTPUT_KEY, []))
+    metrics.merge(workeroutput.get(METRICS_OUTPUT_KEY, []))
+    profiler.merge(workeroutput.get(PROFILE_OUTPUT_KEY, {}))
+    page_loads.merge(workeroutput.get(PAGE_LOADS_OUTPUT_KEY, []))
+    network.stats.merge(workeroutput.get(NETWORK_OUTPUT_KEY, {}))
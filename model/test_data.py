@@ -1,52 +1,136 @@
+import dataclasses
 import json
 import os
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
 
-from utils.common import get_env
-from utils.constants import BASE_DIR, ENV_DATA, TEST_DATA
+from utils.constants import BASE_DIR, DATASETS_DIR, ENV_DATA, TEST_DATA
+from utils.json_stream import iter_json_array
+from utils.run_config import get_run_config
 
 
+@dataclasses.dataclass(frozen=True)
 class Pages:
+    __slots__ = ("home",)
     home: str
 
 
+@dataclasses.dataclass(frozen=True)
 class Services:
+    __slots__ = ("xray_url",)
     xray_url: str
 
 
+@dataclasses.dataclass(frozen=True)
 class User:
+    __slots__ = ("email", "password", "name")
     email: str
     password: str
-    name: str
+    name: Optional[str]
 
 
+@dataclasses.dataclass(frozen=True)
 class Users:
+    __slots__ = ("primary_user",)
     primary_user: User
 
 
+@dataclasses.dataclass(frozen=True)
 class Data:
+    __slots__ = ("base_url", "pages", "services")
     base_url: str
-    users: Users
     pages: Pages
     services: Services
 
 
-def _read_test_data_json(obj):
-    test_data = Data()
-    test_data.__dict__.update(obj)
-    return test_data
+@dataclasses.dataclass(frozen=True)
+class EnvData:
+    __slots__ = ("users", "blocked_hosts")
+    users: Users
+    blocked_hosts: Optional[List[str]]
+
+
+def build_record(cls, obj):
+    """
+    Build typed record from parsed json, missing keys are None and unknown keys are ignored
+    :param cls: dataclass type
+    :param obj: dict with parsed json
+    :return: record instance
+    """
+    values = {}
+    for field in dataclasses.fields(cls):
+        value = obj.get(field.name)
+        if dataclasses.is_dataclass(field.type) and isinstance(value, dict):
+            value = build_record(field.type, value)
+        values[field.name] = value
+    return cls(**values)
 
 
 def open_json(path):
-    f = open(os.path.join(BASE_DIR, path))
-    return json.load(f, object_hook=_read_test_data_json)
+    """
+    Read and parse json file relative to project dir
+    :param path: relative path
+    :return: parsed json
+    """
+    with open(os.path.join(BASE_DIR, path)) as f:
+        return json.load(f)
 
 
 def get_json(obj):
-    return json.loads(json.dumps(obj, default=lambda o: getattr(o, "__dict__", str(o))))
+    """
+    Convert record to plain dicts and lists
+    :param obj: record or parsed json
+    :return: plain json object
+    """
+    return dataclasses.asdict(obj) if dataclasses.is_dataclass(obj) else obj
 
 
-_test_data = open_json(TEST_DATA)
-_env_data = open_json(ENV_DATA.format(get_env()))
+@lru_cache(maxsize=None)
+def load_test_data():
+    """
+    Load common test data once per process
+    :return: Data record
+    """
+    return build_record(Data, open_json(TEST_DATA))
+
+
+@lru_cache(maxsize=None)
+def load_env_data(env):
+    """
+    Load environment test data once per process and environment
+    :param env: environment name
+    :return: EnvData record
+    """
+    return build_record(EnvData, open_json(ENV_DATA.format(env)))
+
+
+@lru_cache(maxsize=32)
+def load_dataset(name):
+    """
+    Load per test json dataset on demand, cached once per process
+    :param name: dataset file name without extension
+    :return: parsed json
+    """
+    return open_json(os.path.join(DATASETS_DIR, "{}.json".format(name)))
+
+
+def iter_dataset(name, path="") -> Iterator[Dict[str, Any]]:
+    """
+    Stream records of a json lines dataset, or of the array at path of a json dataset,
+    one record in memory at a time
+    :param name: dataset file name without extension
+    :param path: dotted path of the array in a json dataset, empty for a root array
+    :return: iterator of records
+    """
+    file_path = os.path.join(BASE_DIR, DATASETS_DIR, name)
+    if os.path.exists(file_path + ".jsonl"):
+        with open(file_path + ".jsonl") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(file_path + ".json", "rb") as f:
+            yield from iter_json_array(f, path)
 
 
 class TestData:
@@ -54,12 +138,20 @@ class TestData:
     Test Data class
     """
 
-    data = _test_data
-    env = _env_data
+    @property
+    def data(self):
+        return load_test_data()
+
+    @property
+    def env(self):
+        return load_env_data(get_run_config().env)
 
     def get_primary_user(self):
         return self.env.users.primary_user
 
+    def get_blocked_hosts(self):
+        return self.env.blocked_hosts or []
+
     def get_base_url(self):
         return self.data.base_url
 
@@ -68,3 +160,6 @@ class TestData:
 
     def get_xray_url(self):
         return self.data.services.xray_url
+
+    def get_dataset(self, name):
+        return load_dataset(name)
@@ -0,0 +1,87 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from loguru import logger
+
+from service.base_api import BaseAPI
+from utils.run_config import get_run_config
+
+
+async def gather_limited(awaitables, limit=None, return_exceptions=False):
+    """
+    Await many calls concurrently with at most limit of them in flight
+    :param awaitables: iterable of coroutines, for example api.get calls
+    :param limit: max concurrent calls, API_POOL_SIZE by default
+    :param return_exceptions: return exceptions as results instead of raising the first one
+    :return: list of results in the same order
+    """
+    pool_size = get_run_config().api_pool_size
+    limit = limit or pool_size
+    if limit > pool_size:
+        logger.warning(
+            "Concurrency limit {} is above API_POOL_SIZE, only {} api calls run at once".format(
+                limit, pool_size
+            )
+        )
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable):
+        """
+        Await call once there is a free slot
+        :param awaitable: coroutine
+        :return: call result
+        """
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(
+        *(run(awaitable) for awaitable in awaitables), return_exceptions=return_exceptions
+    )
+
+
+async def map_limited(func, items, limit=None, return_exceptions=False):
+    """
+    Call async function for every item concurrently with at most limit calls in flight
+    :param func: async function receiving one item
+    :param items: iterable of items
+    :param limit: max concurrent calls, API_POOL_SIZE by default
+    :param return_exceptions: return exceptions as results instead of raising the first one
+    :return: list of results in the same order as items
+    """
+    return await gather_limited((func(item) for item in items), limit, return_exceptions)
+
+
+class AsyncBaseAPI(BaseAPI):
+    """
+    Asyncio variant of BaseAPI, calls are awaitable and run on the pooled session of the process
+    so retries, timeouts and keep-alive are the same as the sync client
+    """
+
+    _executor = None
+    _executor_pid = None
+
+    @classmethod
+    def get_executor(cls):
+        """
+        Get executor running the blocking calls, sized as the connection pool
+        :return: ThreadPoolExecutor
+        """
+        if AsyncBaseAPI._executor is None or AsyncBaseAPI._executor_pid != os.getpid():
+            AsyncBaseAPI._executor = ThreadPoolExecutor(
+                max_workers=get_run_config().api_pool_size, thread_name_prefix="async-api"
+            )
+            AsyncBaseAPI._executor_pid = os.getpid()
+        return AsyncBaseAPI._executor
+
+    async def request(self, method, path, **kwargs):
+        """
+        Send request without blocking the event loop
+        :param method: http method
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        call = partial(BaseAPI.request, self, method, path, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.get_executor(), call)
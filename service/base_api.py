@@ -1,11 +1,18 @@
 import json
+import os
 from typing import Any, Callable, List, TypeVar
 
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from model.test_data import TestData
+from utils.constants import IDEMPOTENT_METHODS, RETRY_STATUSES
+from utils.json_stream import iter_json_array
+from utils.metrics import instrument
+from utils.run_config import get_run_config
 
-data = TestData()
 T = TypeVar("T")
 
 
@@ -75,26 +82,139 @@ def from_int(x: Any) -> int:
     return x
 
 
-def get_response(response):
+def get_response(response, stream_path=None):
     """
-    Load json from text
-    :param response: text string
-    :return: response output
+    Load json from text, or stream items of an array when stream_path is given
+    :param response: requests response, made with stream=True when streaming
+    :param stream_path: dotted path of the array to stream like data.items, empty for root array
+    :return: response output, or iterator of array items when streaming
     """
-    return json.loads(response.text)
+    if stream_path is None:
+        return json.loads(response.text)
+    response.raw.decode_content = True
+    return iter_json_array(response.raw, stream_path)
 
 
+def get_request_target(args, kwargs):
+    """
+    Get metrics target of a request, the path without query string
+    :param args: positional arguments without self
+    :param kwargs: keyword arguments
+    :return: string like GET /jobs
+    """
+    method = args[0] if args else kwargs.get("method", "")
+    path = args[1] if len(args) > 1 else kwargs.get("path", "")
+    return "{} {}".format(method.upper(), path.split("?")[0])
+
+
+@instrument(include=("request",), target=get_request_target)
 class BaseAPI:
     """
     Base API class to initialize all base services info
     """
 
-    url = data.get_base_url()
     headers = {"Content-Type": "application/json"}
+    _session = None
+    _session_pid = None
 
-    def __init__(self, base_url=url):
+    def __init__(self, base_url=None):
         """
         Constructor Base service API
-        :param base_url: string with base url for calls
+        :param base_url: string with base url for calls, test data base url by default
+        """
+        self.base_url = base_url or TestData().get_base_url()
+
+    @staticmethod
+    def _create_session():
+        """
+        Create session with connection pool, keep-alive and retry with backoff for idempotent calls
+        :return: requests session
+        """
+        config = get_run_config()
+        retry = Retry(
+            total=config.api_retries,
+            backoff_factor=config.api_backoff,
+            allowed_methods=IDEMPOTENT_METHODS,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=config.api_pool_size,
+            pool_maxsize=config.api_pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.headers.update({"Connection": "keep-alive"})
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def get_session(cls):
+        """
+        Get the pooled session of the current process, shared by every service class
+        :return: requests session
+        """
+        if BaseAPI._session is None or BaseAPI._session_pid != os.getpid():
+            BaseAPI._session = cls._create_session()
+            BaseAPI._session_pid = os.getpid()
+        return BaseAPI._session
+
+    def request(self, method, path, **kwargs):
+        """
+        Send request with the pooled session and default timeout and headers
+        :param method: http method
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        url = path if path.startswith("http") else self.base_url + path
+        kwargs.setdefault("timeout", get_run_config().api_timeout)
+        kwargs["headers"] = dict(self.headers, **kwargs.get("headers", {}))
+        logger.debug("{} {}".format(method.upper(), url))
+        return self.get_session().request(method, url, **kwargs)
+
+    def get(self, path, **kwargs):
+        """
+        Send GET request
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        """
+        Send POST request
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        """
+        Send PUT request
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        """
+        Send PATCH request
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
+        """
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        """
+        Send DELETE request
+        :param path: path added to base url, or full url
+        :param kwargs: requests arguments
+        :return: response
         """
-        self.base_url = base_url
+        return self.request("DELETE", path, **kwargs)
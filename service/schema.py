@@ -0,0 +1,310 @@
+import types
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+NONE_TYPE = type(None)
+UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+PRIMITIVES = {
+    str: (str,),
+    int: (int,),
+    float: (float, int),
+    bool: (bool,),
+    NONE_TYPE: (NONE_TYPE,),
+}
+
+
+class SchemaError(NamedTuple):
+    """
+    Mismatch found while validating a payload
+    """
+
+    path: str
+    expected: str
+    actual: str
+
+    def __str__(self):
+        """
+        Readable mismatch
+        :return: string
+        """
+        return "{}: expected {}, got {}".format(self.path, self.expected, self.actual)
+
+
+def format_path(path):
+    """
+    Build readable json path from linked path tuples, only done when there is a mismatch
+    :param path: tuple with parent path and key, or root string
+    :return: string like $.items[3].name
+    """
+    keys = []
+    while isinstance(path, tuple):
+        path, key = path
+        keys.append("[{}]".format(key) if isinstance(key, int) else ".{}".format(key))
+    return path + "".join(reversed(keys))
+
+
+def type_name(value):
+    """
+    Get json type name of a value
+    :param value: any value
+    :return: string
+    """
+    return "null" if value is None else type(value).__name__
+
+
+class SchemaCompiler:
+    """
+    Compile a declared response model once into a validator function. Validators never raise,
+    they append every mismatch found in a single pass
+    """
+
+    def __init__(self):
+        """
+        Constructor schema compiler
+        """
+        self._compiled = {}
+
+    def compile(self, schema):
+        """
+        Compile schema into checker
+        :param schema: type, typing construct or annotated model class
+        :return: checker(value, path, errors) returning true if value matches
+        """
+        key = schema if isinstance(schema, type) else repr(schema)
+        if key in self._compiled:
+            return self._compiled[key]
+        if isinstance(schema, type) and schema not in PRIMITIVES and get_type_hints(schema):
+            # placeholder allows recursive models
+            self._compiled[key] = lambda value, path, errors: checker(value, path, errors)
+        checker = self._build(schema)
+        self._compiled[key] = checker
+        return checker
+
+    def _build(self, schema):
+        """
+        Build checker for schema
+        :param schema: type, typing construct or annotated model class
+        :return: checker
+        """
+        if schema is Any:
+            return lambda value, path, errors: True
+        if schema is None:
+            schema = NONE_TYPE
+        origin = get_origin(schema)
+        if schema in PRIMITIVES:
+            return self._primitive(schema)
+        if origin in UNION_TYPES:
+            return self._union(get_args(schema))
+        if origin in (list, List):
+            return self._list(get_args(schema)[0] if get_args(schema) else Any)
+        if origin in (dict, Dict):
+            return self._dict(get_args(schema)[1] if get_args(schema) else Any)
+        if isinstance(schema, type) and get_type_hints(schema):
+            return self._model(schema)
+        raise TypeError("Schema type {} is not supported".format(schema))
+
+    @staticmethod
+    def _primitive(schema):
+        """
+        Build checker for primitive type, bool is never accepted as a number
+        :param schema: primitive type
+        :return: checker
+        """
+        accepted = PRIMITIVES[schema]
+        expected = "null" if schema is NONE_TYPE else schema.__name__
+
+        def check(value, path, errors):
+            """
+            Check value and append mismatches
+            :param value: value to check
+            :param path: linked path of value
+            :param errors: list of mismatches
+            :return: true if value matches
+            """
+            if type(value) in accepted:
+                return True
+            errors.append(SchemaError(format_path(path), expected, type_name(value)))
+            return False
+
+        check.accepted = accepted
+        return check
+
+    def _union(self, options):
+        """
+        Build checker for union, primitive alternatives are a single type lookup
+        :param options: union types
+        :return: checker
+        """
+        checkers = [self.compile(option) for option in options]
+        accepted = set()
+        for checker in checkers:
+            accepted.update(getattr(checker, "accepted", ()))
+        complex_checkers = [checker for checker in checkers if not hasattr(checker, "accepted")]
+        expected = " | ".join(
+            "null" if option is NONE_TYPE else getattr(option, "__name__", str(option))
+            for option in options
+        )
+
+        def check(value, path, errors):
+            """
+            Check value and append mismatches
+            :param value: value to check
+            :param path: linked path of value
+            :param errors: list of mismatches
+            :return: true if value matches
+            """
+            if type(value) in accepted:
+                return True
+            option_errors = []
+            for checker in complex_checkers:
+                option_errors = []
+                if checker(value, path, option_errors):
+                    return True
+            if len(complex_checkers) == 1 and type(value) in (list, dict):
+                errors.extend(option_errors)
+                return False
+            errors.append(SchemaError(format_path(path), expected, type_name(value)))
+            return False
+
+        if not complex_checkers:
+            check.accepted = tuple(accepted)
+        return check
+
+    def _list(self, item_schema):
+        """
+        Build checker for list, items of primitive type are checked in a tight loop
+        :param item_schema: items type
+        :return: checker
+        """
+        item_check = self.compile(item_schema)
+        accepted = getattr(item_check, "accepted", None)
+
+        def check(value, path, errors):
+            """
+            Check value and append mismatches
+            :param value: value to check
+            :param path: linked path of value
+            :param errors: list of mismatches
+            :return: true if value matches
+            """
+            if type(value) is not list:
+                errors.append(SchemaError(format_path(path), "list", type_name(value)))
+                return False
+            valid = True
+            if accepted is not None:
+                for index, item in enumerate(value):
+                    if type(item) not in accepted:
+                        valid = item_check(item, (path, index), errors) and valid
+            else:
+                for index, item in enumerate(value):
+                    valid = item_check(item, (path, index), errors) and valid
+            return valid
+
+        return check
+
+    def _dict(self, value_schema):
+        """
+        Build checker for dict with any string keys
+        :param value_schema: values type
+        :return: checker
+        """
+        value_check = self.compile(value_schema)
+
+        def check(value, path, errors):
+            """
+            Check value and append mismatches
+            :param value: value to check
+            :param path: linked path of value
+            :param errors: list of mismatches
+            :return: true if value matches
+            """
+            if type(value) is not dict:
+                errors.append(SchemaError(format_path(path), "dict", type_name(value)))
+                return False
+            valid = True
+            for key, item in value.items():
+                valid = value_check(item, (path, key), errors) and valid
+            return valid
+
+        return check
+
+    def _model(self, model):
+        """
+        Build checker for model class, every annotated field is a required key unless it
+        accepts null
+        :param model: class with annotations
+        :return: checker
+        """
+        fields = [(name, self.compile(hint)) for name, hint in get_type_hints(model).items()]
+        optional = {
+            name
+            for name, hint in get_type_hints(model).items()
+            if get_origin(hint) in UNION_TYPES and NONE_TYPE in get_args(hint)
+        }
+        missing = object()
+
+        def check(value, path, errors):
+            """
+            Check value and append mismatches
+            :param value: value to check
+            :param path: linked path of value
+            :param errors: list of mismatches
+            :return: true if value matches
+            """
+            if type(value) is not dict:
+                errors.append(SchemaError(format_path(path), model.__name__, type_name(value)))
+                return False
+            valid = True
+            for name, field_check in fields:
+                item = value.get(name, missing)
+                if item is missing:
+                    if name not in optional:
+                        errors.append(SchemaError(format_path((path, name)), "key", "missing"))
+                        valid = False
+                else:
+                    valid = field_check(item, (path, name), errors) and valid
+            return valid
+
+        return check
+
+
+_compiler = SchemaCompiler()
+
+
+def compile_schema(schema):
+    """
+    Compile schema once, the returned validator can be reused for every response
+    :param schema: type, typing construct or annotated model class
+    :return: validator(payload) returning list of SchemaError, empty when payload matches
+    """
+    checker = _compiler.compile(schema)
+
+    def validate(payload):
+        """
+        Validate payload
+        :param payload: parsed json
+        :return: list of SchemaError
+        """
+        errors = []
+        checker(payload, "$", errors)
+        return errors
+
+    return validate
+
+
+def validate(schema, payload):
+    """
+    Validate payload against schema
+    :param schema: type, typing construct or annotated model class
+    :param payload: parsed json
+    :return: list of SchemaError, empty when payload matches
+    """
+    return compile_schema(schema)(payload)
@@ -1,11 +1,33 @@
-import requests
+import json
+
 from loguru import logger
 
 from model.test_data import TestData
 from service.base_api import BaseAPI
-from utils.common import get_env_var
+from service.xray_token import XrayTokenCache
+from utils.constants import XRAY_MAX_PAYLOAD, XRAY_MAX_TESTS
+from utils.run_config import get_run_config
 
-data = TestData()
+
+def chunk_tests(tests, max_tests=XRAY_MAX_TESTS, max_payload=XRAY_MAX_PAYLOAD):
+    """
+    Split test entries in chunks that fit on a single import execution call
+    :param tests: list of test entries
+    :param max_tests: max number of tests per call
+    :param max_payload: max size in bytes of tests per call
+    :return: list of chunks
+    """
+    chunks, chunk, size = [], [], 0
+    for test in tests:
+        test_size = len(json.dumps(test))
+        if chunk and (len(chunk) >= max_tests or size + test_size > max_payload):
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(test)
+        size += test_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
 
 
 class XrayAPI(BaseAPI):
@@ -14,48 +36,96 @@ class XrayAPI(BaseAPI):
     """
 
     execution = None
-    url = data.get_xray_url()
+    _token_cache = None
 
-    def __authorize(self, client_id=None, client_secret=None, token=None):
-        """
-        Authorize xray
-        :param client_id: Env variable with secret info
-        :param client_secret: Env variable with secret info
-        :param token: Env variable with secret info
-        """
-        if not token:
-            body = {"client_id": client_id, "client_secret": client_secret}
-            response = requests.post(
-                self.url + "/authenticate",
-                json=body,
-                headers=self.headers,
-            )
-            token = response.text
-            if response.status_code != 200:
-                logger.error("Failed authorize xray {}".format(token))
-        self.headers["Authorization"] = "Bearer {}".format(token.replace('"', ""))
+    def __init__(self):
+        """
+        Constructor xray API, the url is read from test data when the client is created
+        """
+        super().__init__(TestData().get_xray_url())
 
-    def __import_execution_post(self, start, end, test_result):
+    @property
+    def token_cache(self):
         """
-        Import execution post call
+        Get the token cache shared by every xray client of the process
+        :return: XrayTokenCache
+        """
+        if XrayAPI._token_cache is None:
+            XrayAPI._token_cache = XrayTokenCache(self.base_url)
+        return XrayAPI._token_cache
+
+    @staticmethod
+    def get_test_entry(start, end, test_result):
+        """
+        Build xray test entry from test outcome
         :param start: start time
         :param end: end time
         :param test_result: test case outcome
-        :return: post response
+        :return: dict with test entry
         """
         test = test_result.head_line.split("_")
         test_id = "MTH-{}".format(test[len(test) - 1])
         status = test_result.outcome.upper()
         result = test_result.longreprtext
         comment = result if result != "" else "Automated Execution"
+        return {
+            "testKey": test_id,
+            "start": start,
+            "finish": end,
+            "comment": comment,
+            "status": status,
+        }
+
+    @staticmethod
+    def __get_auth_headers(token):
+        """
+        Get authorization header, shared class headers are not modified
+        :param token: bearer token
+        :return: dict with headers
+        """
+        return {"Authorization": "Bearer {}".format(token)}
+
+    def __import_execution_post(self, execution, start, end, tests):
+        """
+        Import execution post call
+        :param execution: test execution key
+        :param start: start time
+        :param end: end time
+        :param tests: list of test entries
+        :return: post response
+        """
         body = {
-            "testExecutionKey": self.execution,
+            "testExecutionKey": execution,
             "info": {"startDate": start, "finishDate": end},
-            "tests": [{"testKey": test_id, "comment": comment, "status": status}],
+            "tests": tests,
         }
-        response = requests.post(self.url + "/import/execution", json=body, headers=self.headers)
+        token = self.token_cache.get_token()
+        response = self.post(
+            "/import/execution", json=body, headers=self.__get_auth_headers(token)
+        )
+        if response.status_code == 401 and not self.token_cache.is_static():
+            logger.warning("Xray token was rejected, authenticating again")
+            self.token_cache.invalidate(token)
+            token = self.token_cache.get_token()
+            response = self.post(
+                "/import/execution", json=body, headers=self.__get_auth_headers(token)
+            )
         return response
 
+    def __log_response(self, response):
+        """
+        Log import execution response
+        :param response: post response
+        """
+        if response.status_code == 200:
+            logger.info("Updated Xray Jira execution")
+        else:
+            logger.error(
+                "Fail to update Xray Jira execution {} {}".format(
+                    response.status_code, response.text
+                )
+            )
+
     def send_xray_results(self, start, end, test_result):
         """
         Send results to Jira
@@ -64,20 +134,22 @@ class XrayAPI(BaseAPI):
         :param test_result: test case outcome
         :return:
         """
-        self.execution = get_env_var("EXECUTION")
+        self.execution = get_run_config().execution
         if self.execution:
-            if get_env_var("XRAY_CLIENT_ID") and get_env_var("XRAY_CLIENT_SECRET"):
-                self.__authorize(get_env_var("XRAY_CLIENT_ID"), get_env_var("XRAY_CLIENT_SECRET"))
-            elif get_env_var("TOKEN"):
-                self.__authorize(token=get_env_var("TOKEN"))
-            else:
-                raise ConnectionError("There is no authorization to connect to Jira")
-            response = self.__import_execution_post(start, end, test_result)
-            if response.status_code == 200:
-                logger.info("Updated Xray Jira execution")
-            else:
-                logger.error(
-                    "Fail to update Xray Jira execution {} {}".format(
-                        response.status_code, response.text
-                    )
-                )
+            test = self.get_test_entry(start, end, test_result)
+            response = self.__import_execution_post(self.execution, start, end, [test])
+            self.__log_response(response)
+
+    def send_batch_results(self, execution, tests):
+        """
+        Send results of many tests to Jira in as few calls as payload limits allow
+        :param execution: test execution key
+        :param tests: list of test entries
+        """
+        if not tests:
+            return
+        for chunk in chunk_tests(tests):
+            start = min(test["start"] for test in chunk)
+            end = max(test["finish"] for test in chunk)
+            logger.info("Sending {} results to Xray execution {}".format(len(chunk), execution))
+            self.__log_response(self.__import_execution_post(execution, start, end, chunk))
@@ -0,0 +1,73 @@
+from collections import defaultdict
+
+from loguru import logger
+
+from service.xray import XrayAPI
+from utils.run_config import get_run_config
+
+WORKER_OUTPUT_KEY = "xray_results"
+
+
+def is_batch_mode():
+    """
+    Check if xray results are sent in batch at session finish
+    :return: true unless XRAY_MODE is per_test
+    """
+    return get_run_config().xray_mode != "per_test"
+
+
+class XrayCollector:
+    """
+    Collect xray test entries in memory and send them at session finish
+    """
+
+    def __init__(self):
+        """
+        Constructor xray collector
+        """
+        self.results = []
+
+    def add(self, start, end, test_result):
+        """
+        Add test outcome to the collected results
+        :param start: start time
+        :param end: end time
+        :param test_result: test case outcome
+        """
+        execution = get_run_config().execution
+        if execution:
+            test = XrayAPI.get_test_entry(start, end, test_result)
+            self.results.append({"execution": execution, "test": test})
+
+    def extend(self, results):
+        """
+        Merge results collected by another worker
+        :param results: list of collected results
+        """
+        self.results.extend(results)
+
+    def group_by_execution(self):
+        """
+        Group collected test entries by test execution key
+        :return: dict with execution key and list of test entries
+        """
+        executions = defaultdict(list)
+        for result in self.results:
+            executions[result["execution"]].append(result["test"])
+        return executions
+
+    def send(self):
+        """
+        Send all collected results to Jira
+        """
+        executions = self.group_by_execution()
+        if executions:
+            api = XrayAPI()
+            for execution, tests in executions.items():
+                api.send_batch_results(execution, tests)
+        else:
+            logger.trace("There are no xray results to send")
+        self.results = []
+
+
+collector = XrayCollector()
@@ -0,0 +1,98 @@
+import hashlib
+import time
+
+from loguru import logger
+
+from service.base_api import BaseAPI
+from utils.common import get_env_var
+from utils.constants import XRAY_TOKEN_TTL
+from utils.file_cache import get_cache_path, locked_json
+
+TOKEN_CACHE = "xray_token.json"
+# bearer tokens are readable by the owner only from the moment the file is created
+TOKEN_CACHE_MODE = 0o600
+
+
+class XrayTokenCache:
+    """
+    Xray bearer token cache shared by all the xdist workers through a locked file
+    """
+
+    def __init__(self, url, ttl=XRAY_TOKEN_TTL):
+        """
+        Constructor xray token cache
+        :param url: xray api url
+        :param ttl: seconds a token is reused before authenticating again
+        """
+        self.url = url
+        self.ttl = ttl
+        self._token = None
+        self._expires_at = 0
+
+    @staticmethod
+    def _get_credentials():
+        """
+        Get xray credentials from env variables
+        :return: client id and client secret
+        """
+        return get_env_var("XRAY_CLIENT_ID"), get_env_var("XRAY_CLIENT_SECRET")
+
+    def _get_cache_key(self):
+        """
+        Get cache entry key, it never contains the secret itself
+        :return: string key
+        """
+        client_id, client_secret = self._get_credentials()
+        raw = "{}|{}|{}".format(self.url, client_id, client_secret)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _authenticate(self):
+        """
+        Call xray authenticate endpoint
+        :return: token string
+        """
+        client_id, client_secret = self._get_credentials()
+        body = {"client_id": client_id, "client_secret": client_secret}
+        response = BaseAPI(self.url).post("/authenticate", json=body)
+        if response.status_code != 200:
+            raise ConnectionError("Failed authorize xray {}".format(response.text))
+        logger.info("Authenticated on Xray")
+        return response.text.replace('"', "")
+
+    def is_static(self):
+        """
+        Check if token comes from the TOKEN env variable, it can not be renewed
+        :return: boolean
+        """
+        return bool(get_env_var("TOKEN")) and not all(self._get_credentials())
+
+    def get_token(self):
+        """
+        Get valid token, authenticating only when there is no valid cached one
+        :return: token string
+        """
+        if self.is_static():
+            return get_env_var("TOKEN").replace('"', "")
+        if not all(self._get_credentials()):
+            raise ConnectionError("There is no authorization to connect to Jira")
+        now = time.time()
+        if self._token and now < self._expires_at:
+            return self._token
+        with locked_json(get_cache_path(TOKEN_CACHE), mode=TOKEN_CACHE_MODE) as cache:
+            entry = cache.get(self._get_cache_key())
+            if not entry or now >= entry["expires_at"]:
+                entry = {"token": self._authenticate(), "expires_at": now + self.ttl}
+                cache[self._get_cache_key()] = entry
+        self._token, self._expires_at = entry["token"], entry["expires_at"]
+        return self._token
+
+    def invalidate(self, token):
+        """
+        Drop token rejected by xray so next call authenticates again
+        :param token: rejected token
+        """
+        self._token, self._expires_at = None, 0
+        with locked_json(get_cache_path(TOKEN_CACHE), mode=TOKEN_CACHE_MODE) as cache:
+            entry = cache.get(self._get_cache_key())
+            if entry and entry["token"] == token:
+                del cache[self._get_cache_key()]
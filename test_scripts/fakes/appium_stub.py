@@ -0,0 +1,123 @@
+import json
+import socket
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def bind_consecutive_servers(count):
+    """
+    Bind http servers on count consecutive free ports, like APPIUM_PORT + slot
+    :param count: number of servers
+    :return: list of http servers, handlers are set by the caller
+    """
+    while True:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            base = probe.getsockname()[1]
+        servers = []
+        try:
+            for offset in range(count):
+                servers.append(ThreadingHTTPServer(("127.0.0.1", base + offset), None))
+            return servers
+        except OSError:
+            for server in servers:
+                server.server_close()
+
+
+class StubAppium:
+    """
+    Appium servers stub listening on consecutive ports, it records the capabilities of every
+    new session and ends sessions on delete
+    """
+
+    def __init__(self, count=2):
+        """
+        Constructor stub appium
+        :param count: number of appium servers, one per device slot
+        """
+        self.sessions = []
+        self._lock = threading.Lock()
+        self._servers = bind_consecutive_servers(count)
+        for server in self._servers:
+            server.RequestHandlerClass = self._handler(server.server_port)
+        self._threads = [
+            threading.Thread(target=server.serve_forever, daemon=True) for server in self._servers
+        ]
+
+    @property
+    def port(self):
+        """
+        Port of the first appium server, APPIUM_PORT of the run
+        :return: int
+        """
+        return self._servers[0].server_port
+
+    def __enter__(self):
+        """
+        Start serving in background threads
+        :return: self
+        """
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *args):
+        """
+        Stop servers
+        :param args: exception info
+        """
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def new_session(self, port, body):
+        """
+        Record new session capabilities
+        :param port: port of the appium server that got the request
+        :param body: new session request body
+        :return: W3C new session value
+        """
+        capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+        with self._lock:
+            self.sessions.append({"port": port, "capabilities": capabilities})
+        return {"sessionId": uuid.uuid4().hex, "capabilities": capabilities}
+
+    def _handler(self, port):
+        """
+        Build request handler bound to one appium server
+        :param port: server port
+        :return: handler class
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Stub appium request handler
+            """
+
+            def _respond(self):
+                """
+                Answer new session and delete session, every other command returns null
+                """
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                value = None
+                if self.command == "POST" and self.path == "/wd/hub/session":
+                    value = stub.new_session(port, body)
+                payload = json.dumps({"value": value}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _respond
+
+            def log_message(self, *args):
+                """
+                Silence request logs
+                :param args: log arguments
+                """
+
+        return Handler
@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+
+import utils.device_pool
+import utils.devices
+from utils.driver import Driver
+
+
+def main(cache_dir):
+    """
+    Lease a device like an xdist worker running a mobile test, print the lease and keep it until
+    a line is read on stdin
+    :param cache_dir: dir used instead of the run cache
+    """
+
+    def get_cache_path(name):
+        """
+        Get path of a cache file inside the given dir
+        :param name: file name
+        :return: string with full path
+        """
+        return os.path.join(cache_dir, name)
+
+    utils.device_pool.get_cache_path = utils.devices.get_cache_path = get_cache_path
+    pool = utils.device_pool.device_pool
+    pool.poll = 0.1
+    lease = pool.acquire()
+    try:
+        driver = Driver().init_mobile_driver(lease)
+        port = int(lease.appium_url.split(":")[2].split("/")[0])
+        print(
+            json.dumps(
+                {"serial": lease.device.serial, "port": port, "system_port": lease.system_port}
+            ),
+            flush=True,
+        )
+        sys.stdin.readline()
+        driver.quit()
+    finally:
+        pool.release()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
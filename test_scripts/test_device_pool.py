@@ -0,0 +1,101 @@
+import json
+import os
+import select
+import subprocess
+import sys
+
+from fakes.appium_stub import StubAppium
+
+from utils.constants import BASE_DIR
+
+FAKES_DIR = os.path.join(BASE_DIR, "test_scripts", "fakes")
+DEVICES = ["emulator-5554", "emulator-5556"]
+PLUGGED_DEVICE = "emulator-5552"
+SYSTEM_PORT = 8200
+
+
+def start_worker(worker, env, cache_dir):
+    """
+    Start a process leasing a device as an xdist worker
+    :param worker: xdist worker id
+    :param env: env variables of the run
+    :param cache_dir: run cache dir
+    :return: process
+    """
+    return subprocess.Popen(
+        [sys.executable, os.path.join(FAKES_DIR, "lease_worker.py"), str(cache_dir)],
+        env=dict(env, PYTEST_XDIST_WORKER=worker),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def read_lease(process, timeout=30):
+    """
+    Read lease printed by a worker process
+    :param process: worker process
+    :param timeout: seconds to wait
+    :return: dict with serial, port and system_port, or None if the worker is still waiting
+    """
+    ready, _, _ = select.select([process.stdout], [], [], timeout)
+    return json.loads(process.stdout.readline()) if ready else None
+
+
+def finish(process):
+    """
+    Let a worker quit its session and release its device
+    :param process: worker process
+    """
+    process.communicate("release\n", timeout=30)
+    assert process.returncode == 0
+
+
+def test_device_pool_leases_devices_across_workers(tmp_path):
+    with StubAppium(count=len(DEVICES) + 1) as appium:
+        env = dict(
+            os.environ,
+            PYTHONPATH=BASE_DIR,
+            ADB_PATH=os.path.join(FAKES_DIR, "adb"),
+            FAKE_ADB_DEVICES=" ".join(DEVICES),
+            DEVICE_POOL="1",
+            EXECUTE_ON="android",
+            APPIUM_HOST="127.0.0.1",
+            APPIUM_PORT=str(appium.port),
+            SYSTEM_PORT=str(SYSTEM_PORT),
+        )
+        first = start_worker("gw0", env, tmp_path)
+        first_lease = read_lease(first)
+        second = start_worker("gw1", env, tmp_path)
+        second_lease = read_lease(second)
+
+        assert {first_lease["serial"], second_lease["serial"]} == set(DEVICES)
+        assert {first_lease["system_port"], second_lease["system_port"]} == {
+            SYSTEM_PORT,
+            SYSTEM_PORT + 1,
+        }
+        sessions = {session["capabilities"]["appium:udid"]: session for session in appium.sessions}
+        for lease in (first_lease, second_lease):
+            session = sessions[lease["serial"]]
+            assert session["port"] == lease["port"]
+            assert session["capabilities"]["appium:systemPort"] == lease["system_port"]
+            assert lease["port"] - appium.port == lease["system_port"] - SYSTEM_PORT
+
+        third = start_worker("gw2", env, tmp_path)
+        assert read_lease(third, timeout=3) is None
+        finish(first)
+        third_lease = read_lease(third)
+        assert third_lease == first_lease
+
+        os.remove(tmp_path / "devices.json")
+        plugged_env = dict(env, FAKE_ADB_DEVICES=" ".join(DEVICES + [PLUGGED_DEVICE]))
+        fourth = start_worker("gw3", plugged_env, tmp_path)
+        fourth_lease = read_lease(fourth)
+        assert fourth_lease["serial"] == PLUGGED_DEVICE
+        assert fourth_lease["system_port"] == SYSTEM_PORT + 2
+        assert fourth_lease["port"] == appium.port + 2
+        for process in (second, third, fourth):
+            finish(process)
+
+    with open(tmp_path / "device_leases.json") as f:
+        assert json.load(f)["leases"] == {}
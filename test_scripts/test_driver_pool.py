@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import conftest
+import utils.driver_pool
+from utils.driver import get_window_size
+from utils.driver_pool import DriverPool
+from utils.screenshot import screenshots
+
+
+class FakeDriver:
+    """
+    Webdriver double that can crash like a browser whose process died
+    """
+
+    def __init__(self):
+        """
+        Constructor fake driver
+        """
+        self.crashed = False
+        self.quit_calls = 0
+        self.size = get_window_size()
+        self.switch_to = SimpleNamespace(window=lambda handle: None, default_content=lambda: None)
+
+    @property
+    def window_handles(self):
+        """
+        Get window handles, fails once crashed
+        :return: list of handles
+        """
+        self._check()
+        return ["main"]
+
+    def get_screenshot_as_base64(self):
+        """
+        Take screenshot, fails once crashed
+        :return: base64 png string
+        """
+        self._check()
+        return ""
+
+    def set_window_size(self, width, height):
+        """
+        Resize window
+        :param width: window width
+        :param height: window height
+        """
+        self._check()
+        self.size = (width, height)
+
+    def delete_all_cookies(self):
+        """
+        Delete cookies
+        """
+        self._check()
+
+    def execute_script(self, script):
+        """
+        Run script
+        :param script: javascript source
+        """
+        self._check()
+
+    def get(self, url):
+        """
+        Open url
+        :param url: page url
+        """
+        self._check()
+
+    def quit(self):
+        """
+        Count quit calls
+        """
+        self.quit_calls += 1
+
+    def _check(self):
+        """
+        Raise like a webdriver command sent to a dead browser
+        """
+        if self.crashed:
+            raise WebDriverException("chrome not reachable")
+
+
+def test_web_setup_replaces_crashed_pooled_driver(monkeypatch):
+    pool = DriverPool(FakeDriver)
+    monkeypatch.setattr(conftest, "is_pool_enabled", lambda: True)
+    monkeypatch.setattr(conftest, "get_driver_pool", lambda factory: pool)
+    monkeypatch.setattr(screenshots, "enabled", True)
+    monkeypatch.setattr(screenshots, "mode", "always")
+    request = SimpleNamespace(
+        node=SimpleNamespace(
+            nodeid="test_crash", rep_call=SimpleNamespace(outcome="failed", failed=True)
+        )
+    )
+
+    setup = conftest.web_setup.__wrapped__(request)
+    next(setup)
+    crashed_driver = conftest.BaseScreen._driver
+    crashed_driver.crashed = True
+    with pytest.raises(WebDriverException):
+        next(setup)
+
+    assert crashed_driver.quit_calls == 1
+    assert pool._in_use == {}
+    new_driver = pool.acquire()
+    assert new_driver is not crashed_driver
+
+
+def test_pool_restores_window_size_of_reused_driver(monkeypatch):
+    monkeypatch.setattr(utils.driver_pool, "navigate", lambda *args: True)
+    pool = DriverPool(FakeDriver)
+    driver = pool.acquire()
+    driver.set_window_size(640, 480)
+    pool.release(driver)
+
+    assert pool.acquire() is driver
+    assert driver.size == get_window_size()
+    assert driver.quit_calls == 0
@@ -0,0 +1,175 @@
+import json
+from types import SimpleNamespace
+
+from utils.constants import DURATION_SMOOTHING
+from utils.durations import DurationHistory
+from utils.scheduling import DurationScheduling
+
+
+def report(nodeid, when, duration, outcome="passed"):
+    """
+    Build a test phase report like pytest_runtest_logreport receives
+    :param nodeid: test nodeid
+    :param when: setup, call or teardown
+    :param duration: phase seconds
+    :param outcome: passed, failed, skipped or rerun
+    :return: report
+    """
+    return SimpleNamespace(
+        nodeid=nodeid,
+        when=when,
+        duration=duration,
+        failed=outcome == "failed",
+        skipped=outcome == "skipped",
+    )
+
+
+def run_test(history, nodeid, call, outcome="passed"):
+    """
+    Add the reports of one test attempt, setup and teardown take one second each
+    :param history: DurationHistory
+    :param nodeid: test nodeid
+    :param call: call phase seconds
+    :param outcome: call phase outcome
+    """
+    history.add_report(report(nodeid, "setup", 1.0))
+    history.add_report(report(nodeid, "call", call, outcome))
+    history.add_report(report(nodeid, "teardown", 1.0))
+
+
+def test_history_records_duration_and_outcome_of_every_test(tmp_path):
+    path = tmp_path / "durations.json"
+    history = DurationHistory("qa", path=str(path))
+    run_test(history, "test_pass", 2.0)
+    run_test(history, "test_timeout", 30.0, outcome="failed")
+    run_test(history, "test_rerun", 50.0, outcome="rerun")
+    run_test(history, "test_rerun", 3.0)
+    history.save()
+
+    tests = json.loads(path.read_text())["qa"]
+    assert tests["test_pass"] == {"duration": 4.0, "outcome": "passed", "runs": 1}
+    assert tests["test_timeout"] == {"failed_duration": 32.0, "outcome": "failed", "runs": 1}
+    assert tests["test_rerun"] == {"duration": 5.0, "outcome": "passed", "runs": 1}
+
+    history = DurationHistory("qa", path=str(path))
+    run_test(history, "test_pass", 6.0)
+    run_test(history, "test_timeout", 0.0)
+    history.save()
+
+    tests = json.loads(path.read_text())["qa"]
+    assert (
+        tests["test_pass"]["duration"] == DURATION_SMOOTHING * 8.0 + (1 - DURATION_SMOOTHING) * 4.0
+    )
+    assert tests["test_pass"]["runs"] == 2
+    assert tests["test_timeout"] == {
+        "duration": 2.0,
+        "failed_duration": 32.0,
+        "outcome": "passed",
+        "runs": 2,
+    }
+    assert DurationHistory("dev", path=str(path)).get_durations() == {}
+
+
+def test_history_predicts_failed_tests_at_their_longest_time(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text(
+        json.dumps(
+            {
+                "qa": {
+                    "test_fast": {"duration": 1.0, "outcome": "passed", "runs": 3},
+                    "test_slow": {"duration": 9.0, "outcome": "passed", "runs": 3},
+                    "test_timeout": {"failed_duration": 60.0, "outcome": "failed", "runs": 2},
+                    "test_flaky": {
+                        "duration": 3.0,
+                        "failed_duration": 20.0,
+                        "outcome": "failed",
+                        "runs": 4,
+                    },
+                    "test_fixed": {
+                        "duration": 3.0,
+                        "failed_duration": 20.0,
+                        "outcome": "passed",
+                        "runs": 4,
+                    },
+                }
+            }
+        )
+    )
+    history = DurationHistory("qa", path=str(path))
+
+    assert history.predict(
+        ["test_fast", "test_slow", "test_timeout", "test_flaky", "test_fixed", "test_new"]
+    ) == [1.0, 9.0, 60.0, 20.0, 3.0, 9.0]
+
+
+class FakeNode:
+    """
+    Xdist worker node double recording the tests sent to it
+    """
+
+    def __init__(self, name):
+        """
+        Constructor fake node
+        :param name: gateway id
+        """
+        self.gateway = SimpleNamespace(id=name)
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        """
+        Record tests sent to the worker
+        :param indices: collection indices
+        """
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        """
+        Mark worker as shutting down
+        """
+        self.shutting_down = True
+
+
+class FakeHistory:
+    """
+    Duration history double with fixed predictions
+    """
+
+    def __init__(self, durations):
+        """
+        Constructor fake history
+        :param durations: dict with nodeid and seconds
+        """
+        self.durations = durations
+
+    def predict(self, nodeids):
+        """
+        Predict duration of tests
+        :param nodeids: list of test nodeids
+        :return: list of seconds
+        """
+        return [self.durations[nodeid] for nodeid in nodeids]
+
+
+def test_duration_scheduling_sends_longest_tests_first():
+    durations = {"a": 1.0, "b": 40.0, "c": 0.1, "d": 0.1, "e": 10.0, "f": 20.0, "g": 0.1}
+    config = SimpleNamespace(
+        getvalue=lambda name: ["2*popen"], getoption=lambda name: None, hook=None
+    )
+    scheduler = DurationScheduling(config, history=FakeHistory(durations))
+    nodes = [FakeNode("gw0"), FakeNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, list(durations))
+    scheduler.schedule()
+
+    collection = list(durations)
+    assert [[collection[index] for index in node.sent] for node in nodes] == [
+        ["b", "f"],
+        ["e", "a"],
+    ]
+
+    assert [collection[index] for index in scheduler.pending] == ["c", "d", "g"]
+
+    scheduler.mark_test_complete(nodes[0], collection.index("b"))
+    assert [collection[index] for index in nodes[0].sent[2:]] == ["c"]
@@ -0,0 +1,74 @@
+import io
+import json
+from typing import Any, Dict
+
+import pytest
+
+from utils.json_stream import iter_json_array
+
+DOCUMENT: Dict[str, Any] = {
+    "meta": {"note": 'skip "quoted" {braces} [brackets] \\ and é', "pages": [1, [2, {}]]},
+    "empty": [],
+    "missing": None,
+    "data": {
+        "before": ["}", "]", '\\"', {"deep": [{"x": "{"}]}],
+        "items": [
+            {"id": 1, "name": 'say "hi" {not an object}', "price": 12.5},
+            {"id": 22, "name": "café ✓", "tags": ["a", "b"], "price": 1e3},
+            123456789,
+            "tail \\ \" ]",
+            None,
+            True,
+        ],
+        "after": {"ignored": True},
+    },
+}
+
+
+def stream(document, path, chunk_size):
+    """
+    Stream array at path of a json document
+    :param document: json text
+    :param path: dotted member path
+    :param chunk_size: bytes read on every call
+    :return: list of items
+    """
+    return list(iter_json_array(io.BytesIO(document.encode("utf-8")), path, chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 4096])
+def test_items_match_json_loads_whatever_the_chunk_boundaries(chunk_size):
+    document = json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+
+    assert stream(document, "data.items", chunk_size) == DOCUMENT["data"]["items"]
+    assert stream(document, "meta.pages", chunk_size) == [1, [2, {}]]
+    assert stream(json.dumps([10, 200, 3000]), "", chunk_size) == [10, 200, 3000]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5])
+def test_null_and_empty_arrays_yield_nothing(chunk_size):
+    document = json.dumps(DOCUMENT)
+
+    assert stream(document, "empty", chunk_size) == []
+    assert stream(document, "missing", chunk_size) == []
+    assert stream(" [ ] ", "", chunk_size) == []
+
+
+@pytest.mark.parametrize("path", ["nope", "data.nope", "data.items.nope", "empty.nope"])
+def test_missing_path_raises(path):
+    with pytest.raises((KeyError, ValueError)):
+        stream(json.dumps(DOCUMENT), path, 3)
+
+
+def test_missing_member_raises_key_error():
+    with pytest.raises(KeyError, match="nope"):
+        stream(json.dumps(DOCUMENT), "data.nope", 3)
+
+
+@pytest.mark.parametrize("size", [5, 30, 120, 200, -40, -2, -1])
+def test_truncated_input_raises(size):
+    document = json.dumps(DOCUMENT)
+    truncated = document[:size]
+
+    with pytest.raises(ValueError):
+        stream(truncated, "data.items", 4)
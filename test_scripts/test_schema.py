@@ -0,0 +1,178 @@
+import copy
+from typing import Dict, List, Optional, Union
+
+import pytest
+
+from service.schema import compile_schema
+
+jsonschema = pytest.importorskip("jsonschema")
+
+
+class Address:
+    street: str
+    zip: Optional[str]
+
+
+class User:
+    id: int
+    name: str
+    score: float
+    active: bool
+    address: Address
+    tags: List[str]
+    nicknames: Optional[List[str]]
+    limits: Dict[str, int]
+    ref: Union[int, str]
+
+
+ADDRESS_SCHEMA = {
+    "type": "object",
+    "required": ["street"],
+    "properties": {"street": {"type": "string"}, "zip": {"type": ["string", "null"]}},
+}
+
+USER_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "score", "active", "address", "tags", "limits", "ref"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "score": {"type": "number"},
+        "active": {"type": "boolean"},
+        "address": ADDRESS_SCHEMA,
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "nicknames": {"type": ["array", "null"], "items": {"type": "string"}},
+        "limits": {"type": "object", "additionalProperties": {"type": "integer"}},
+        "ref": {"type": ["integer", "string"]},
+    },
+}
+
+USER = {
+    "id": 7,
+    "name": "Ada",
+    "score": 9.5,
+    "active": True,
+    "address": {"street": "Main", "zip": None},
+    "tags": ["a", "b"],
+    "nicknames": None,
+    "limits": {"daily": 3},
+    "ref": "R-7",
+}
+
+
+def changed(**changes):
+    """
+    Copy of the valid user with changed members, a KeyError value removes the member
+    :param changes: member name and new value, nested members use __ like address__street
+    :return: payload
+    """
+    payload = copy.deepcopy(USER)
+    for name, value in changes.items():
+        *parents, key = name.split("__")
+        target = payload
+        for parent in parents:
+            target = target[parent]
+        if value is KeyError:
+            del target[key]
+        else:
+            target[key] = value
+    return payload
+
+
+def jsonschema_paths(schema, payload):
+    """
+    Get json paths of every jsonschema error, a missing key is reported at the key path
+    :param schema: json schema
+    :param payload: parsed json
+    :return: set of paths
+    """
+    paths = set()
+    for error in jsonschema.Draft7Validator(schema).iter_errors(payload):
+        if error.validator == "required":
+            paths.add("{}.{}".format(error.json_path, error.message.split("'")[1]))
+        else:
+            paths.add(error.json_path)
+    return paths
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        USER,
+        changed(score=9),
+        changed(ref=12),
+        changed(nicknames=["Countess"]),
+        changed(nicknames=KeyError),
+        changed(address__zip=KeyError),
+        changed(address__zip="AB1"),
+        changed(unknown={"any": "thing"}),
+        changed(address__unknown=1),
+        changed(tags=[], limits={}),
+        changed(id="7"),
+        changed(id=True),
+        changed(score="high"),
+        changed(active=1),
+        changed(name=None),
+        changed(name=KeyError),
+        changed(address=KeyError),
+        changed(address__street=KeyError),
+        changed(address__street=5, address__zip=6),
+        changed(address=["Main"]),
+        changed(tags="a"),
+        changed(tags=["a", 2, None]),
+        changed(nicknames=[1]),
+        changed(nicknames="Countess"),
+        changed(limits={"daily": "3", "weekly": 4, "monthly": 2.5}),
+        changed(limits=[1]),
+        changed(ref=1.5),
+        changed(ref=None),
+        changed(ref=["R-7"]),
+        [USER],
+        None,
+    ],
+)
+def test_compiled_validator_matches_jsonschema(payload):
+    errors = compile_schema(User)(payload)
+
+    assert {error.path for error in errors} == jsonschema_paths(USER_SCHEMA, payload)
+
+
+class Page:
+    items: List[Union[Address, List[int]]]
+
+
+PAGE_SCHEMA = {
+    "type": "object",
+    "required": ["items"],
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "anyOf": [
+                    ADDRESS_SCHEMA,
+                    {"type": "array", "items": {"type": "integer"}},
+                ]
+            },
+        }
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [],
+        [{"street": "Main"}, [1, 2], {"street": "Side", "zip": "Z"}],
+        [{"street": 1}],
+        [{"zip": "Z"}],
+        [[1, "2"]],
+        ["Main"],
+        [None],
+    ],
+)
+def test_compiled_union_of_containers_matches_jsonschema(items):
+    payload = {"items": items}
+
+    valid = jsonschema.Draft7Validator(PAGE_SCHEMA).is_valid(payload)
+
+    assert (compile_schema(Page)(payload) == []) == valid
@@ -0,0 +1,147 @@
+import dataclasses
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import service.xray_collector
+from service.xray import XrayAPI, chunk_tests
+from service.xray_collector import XrayCollector
+from utils.run_config import get_run_config
+
+
+def entry(number, comment=""):
+    """
+    Build xray test entry
+    :param number: test number
+    :param comment: comment text, used to size the entry
+    :return: dict with test entry
+    """
+    return {
+        "testKey": "MTH-{}".format(number),
+        "start": "2024-01-01T10:00:{:02d}+00:00".format(number % 60),
+        "finish": "2024-01-01T10:01:{:02d}+00:00".format(number % 60),
+        "comment": comment,
+        "status": "PASSED",
+    }
+
+
+def test_chunks_split_at_max_tests():
+    tests = [entry(number) for number in range(7)]
+
+    assert chunk_tests(tests[:3], max_tests=3) == [tests[:3]]
+    assert chunk_tests(tests[:4], max_tests=3) == [tests[:3], tests[3:4]]
+    assert chunk_tests(tests, max_tests=3) == [tests[:3], tests[3:6], tests[6:]]
+    assert chunk_tests([], max_tests=3) == []
+
+
+def test_chunks_split_at_max_payload():
+    tests = [entry(number, "x" * 50) for number in range(4)]
+    size = len(json.dumps(tests[0]))
+
+    assert chunk_tests(tests, max_payload=size * 2) == [tests[:2], tests[2:]]
+    assert chunk_tests(tests, max_payload=size * 2 - 1) == [[test] for test in tests]
+    assert chunk_tests(tests, max_payload=size * 4) == [tests]
+    assert chunk_tests(tests[:1], max_payload=size - 1) == [tests[:1]]
+
+
+@pytest.fixture()
+def posts(monkeypatch):
+    """
+    Replace xray import execution calls by a recorder, authenticating with a static token
+    :return: list of posted bodies
+    """
+    bodies = []
+
+    def post(api, endpoint, json=None, headers=None):
+        """
+        Record posted body
+        :param api: xray api
+        :param endpoint: endpoint path
+        :param json: request body
+        :param headers: request headers
+        :return: successful response
+        """
+        assert endpoint == "/import/execution"
+        assert headers == {"Authorization": "Bearer static"}
+        bodies.append(json)
+        return SimpleNamespace(status_code=200, text="")
+
+    monkeypatch.setenv("TOKEN", "static")
+    monkeypatch.delenv("XRAY_CLIENT_ID", raising=False)
+    monkeypatch.setattr(XrayAPI, "post", post)
+    return bodies
+
+
+def set_execution(monkeypatch, execution):
+    """
+    Set test execution key of the run
+    :param execution: execution key or None
+    """
+    config = dataclasses.replace(get_run_config(), execution=execution)
+    monkeypatch.setattr(service.xray_collector, "get_run_config", lambda: config)
+
+
+def test_collector_sends_results_of_all_workers_on_finish(monkeypatch, posts):
+    set_execution(monkeypatch, "MTH-100")
+    collector = XrayCollector()
+    collector.add(
+        "2024-01-01T10:00:00+00:00",
+        "2024-01-01T10:00:05+00:00",
+        SimpleNamespace(head_line="test_login_7", outcome="failed", longreprtext="boom"),
+    )
+    collector.extend(
+        [
+            {"execution": "MTH-100", "test": entry(8)},
+            {"execution": "MTH-200", "test": entry(9)},
+        ]
+    )
+
+    assert posts == []
+    collector.send()
+
+    assert [(body["testExecutionKey"], len(body["tests"])) for body in posts] == [
+        ("MTH-100", 2),
+        ("MTH-200", 1),
+    ]
+    assert posts[0]["tests"][0] == {
+        "testKey": "MTH-7",
+        "start": "2024-01-01T10:00:00+00:00",
+        "finish": "2024-01-01T10:00:05+00:00",
+        "comment": "boom",
+        "status": "FAILED",
+    }
+    assert posts[0]["info"] == {
+        "startDate": "2024-01-01T10:00:00+00:00",
+        "finishDate": "2024-01-01T10:01:08+00:00",
+    }
+    assert collector.results == []
+    collector.send()
+    assert len(posts) == 2
+
+
+def test_collector_sends_one_call_per_chunk(monkeypatch, posts):
+    monkeypatch.setattr("service.xray.chunk_tests", lambda tests: chunk_tests(tests, max_tests=2))
+    collector = XrayCollector()
+    collector.extend([{"execution": "MTH-100", "test": entry(number)} for number in range(5)])
+    collector.send()
+
+    assert [[test["testKey"] for test in body["tests"]] for body in posts] == [
+        ["MTH-0", "MTH-1"],
+        ["MTH-2", "MTH-3"],
+        ["MTH-4"],
+    ]
+
+
+def test_collector_without_execution_sends_nothing(monkeypatch, posts):
+    set_execution(monkeypatch, None)
+    collector = XrayCollector()
+    collector.add(
+        "2024-01-01T10:00:00+00:00",
+        "2024-01-01T10:00:05+00:00",
+        SimpleNamespace(head_line="test_login_7", outcome="passed", longreprtext=""),
+    )
+    collector.send()
+
+    assert collector.results == []
+    assert posts == []
@@ -0,0 +1,86 @@
+import json
+import os
+import stat
+
+import pytest
+
+import service.xray_token
+import utils.file_cache
+from service.xray_token import TOKEN_CACHE, XrayTokenCache
+
+URL = "https://xray.example.com/api/v2"
+
+
+@pytest.fixture()
+def cache_path(tmp_path, monkeypatch):
+    """
+    Token cache file inside a temporary dir, with client credentials set
+    :return: path of the token cache file
+    """
+    monkeypatch.setattr(service.xray_token, "get_cache_path", lambda name: str(tmp_path / name))
+    monkeypatch.setenv("XRAY_CLIENT_ID", "client")
+    monkeypatch.setenv("XRAY_CLIENT_SECRET", "secret")
+    monkeypatch.delenv("TOKEN", raising=False)
+    return tmp_path / TOKEN_CACHE
+
+
+@pytest.fixture()
+def tokens(monkeypatch):
+    """
+    Replace xray authenticate call by one returning token-1, token-2 and so on
+    :return: list of returned tokens
+    """
+    issued = []
+
+    def authenticate(cache):
+        """
+        Issue a new token
+        :param cache: token cache
+        :return: token string
+        """
+        issued.append("token-{}".format(len(issued) + 1))
+        return issued[-1]
+
+    monkeypatch.setattr(XrayTokenCache, "_authenticate", authenticate)
+    return issued
+
+
+def test_token_is_shared_through_owner_only_cache_file(cache_path, tokens, monkeypatch):
+    written_modes = []
+
+    def replace(src, dst):
+        """
+        Record permissions of the written temp file before moving it into place
+        :param src: temp file path
+        :param dst: cache file path
+        """
+        written_modes.append(stat.S_IMODE(os.stat(src).st_mode))
+        os.rename(src, dst)
+
+    monkeypatch.setattr(utils.file_cache.os, "replace", replace)
+    assert XrayTokenCache(URL).get_token() == "token-1"
+    assert XrayTokenCache(URL).get_token() == "token-1"
+
+    assert tokens == ["token-1"]
+    assert set(written_modes) == {0o600}
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+    assert "secret" not in cache_path.read_text()
+
+
+def test_expired_token_authenticates_again(cache_path, tokens):
+    assert XrayTokenCache(URL, ttl=0).get_token() == "token-1"
+    assert XrayTokenCache(URL).get_token() == "token-2"
+    assert XrayTokenCache(URL).get_token() == "token-2"
+
+    assert tokens == ["token-1", "token-2"]
+
+
+def test_corrupt_cache_file_authenticates_again(cache_path, tokens):
+    cache_path.write_text('{"truncated": ')
+    os.chmod(cache_path, 0o644)
+
+    assert XrayTokenCache(URL).get_token() == "token-1"
+
+    assert tokens == ["token-1"]
+    assert list(json.loads(cache_path.read_text()).values())[0]["token"] == "token-1"
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
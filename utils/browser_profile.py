@@ -0,0 +1,181 @@
+import json
+import os
+import statistics
+import time
+
+from loguru import logger as log
+
+from utils.common import get_worker_id
+from utils.constants import (
+    BASE_DIR,
+    BROWSER_CACHE_DIR,
+    DURATION_SMOOTHING,
+    PAGE_LOAD_REPORT,
+)
+from utils.file_cache import get_cache_path, locked_json
+
+WORKER_OUTPUT_KEY = "page_loads"
+PAGE_LOAD_HISTORY = "page_loads.json"
+BASELINE_PROFILE = "default/normal"
+
+FAST_CHROME_ARGUMENTS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--autoplay-policy=user-gesture-required",
+    "--blink-settings=imagesEnabled=false",
+]
+FAST_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+FAST_FIREFOX_PREFS = {
+    "permissions.default.image": 2,
+    "media.autoplay.default": 5,
+    "media.autoplay.blocking_policy": 2,
+    "layers.acceleration.disabled": True,
+    "gfx.direct2d.disabled": True,
+    "extensions.enabledScopes": 0,
+    "extensions.update.enabled": False,
+    "app.update.auto": False,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "browser.cache.disk.enable": True,
+}
+
+
+def get_browser_cache_dir(browser):
+    """
+    Get disk cache dir of a browser, one per xdist worker so concurrent browsers never share it
+    :param browser: chrome or firefox
+    :return: string with full path
+    """
+    cache_dir = os.path.join(BASE_DIR, BROWSER_CACHE_DIR, browser, get_worker_id())
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def apply_chrome_profile(options, config):
+    """
+    Apply page load strategy and fast profile to chrome options
+    :param options: ChromeOptions
+    :param config: RunConfig
+    """
+    options.page_load_strategy = config.page_load_strategy
+    if config.browser_profile == "fast":
+        for argument in FAST_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_argument("--disk-cache-dir={}".format(get_browser_cache_dir("chrome")))
+        options.add_experimental_option("prefs", FAST_CHROME_PREFS)
+
+
+def apply_firefox_profile(options, config):
+    """
+    Apply page load strategy and fast profile to firefox options
+    :param options: FirefoxOptions
+    :param config: RunConfig
+    """
+    options.page_load_strategy = config.page_load_strategy
+    if config.browser_profile == "fast":
+        for name, value in FAST_FIREFOX_PREFS.items():
+            options.set_preference(name, value)
+        options.set_preference(
+            "browser.cache.disk.parent_directory", get_browser_cache_dir("firefox")
+        )
+
+
+class PageLoadReport:
+    """
+    Measure time blocked on navigation commands and compare it with the default profile
+    """
+
+    def __init__(self):
+        """
+        Constructor page load report
+        """
+        self.profile = BASELINE_PROFILE
+        self.env = None
+        self.durations = []
+
+    def configure(self, config):
+        """
+        Apply run configuration
+        :param config: RunConfig
+        """
+        self.profile = "{}/{}".format(config.browser_profile, config.page_load_strategy)
+        self.env = config.env
+
+    def navigate(self, navigation, *args):
+        """
+        Run a navigation command and record how long it blocked
+        :param navigation: callable like driver.get or driver.refresh
+        :param args: navigation arguments
+        :return: navigation result
+        """
+        start = time.perf_counter()
+        try:
+            return navigation(*args)
+        finally:
+            self.durations.append(time.perf_counter() - start)
+
+    def merge(self, durations):
+        """
+        Merge durations recorded by another worker
+        :param durations: list of seconds
+        """
+        self.durations.extend(durations)
+
+    def save(self):
+        """
+        Update page load history and write report with time saved against the default profile
+        """
+        if not self.durations:
+            return
+        mean = statistics.mean(self.durations)
+        with locked_json(get_cache_path(PAGE_LOAD_HISTORY)) as history:
+            profiles = history.setdefault(self.env, {})
+            entry = profiles.get(self.profile)
+            if entry:
+                mean = DURATION_SMOOTHING * mean + (1 - DURATION_SMOOTHING) * entry["mean"]
+            profiles[self.profile] = {
+                "mean": round(mean, 4),
+                "runs": (entry or {}).get("runs", 0) + 1,
+            }
+            baseline = profiles.get(BASELINE_PROFILE)
+        report = {
+            "profile": self.profile,
+            "count": len(self.durations),
+            "total": round(sum(self.durations), 3),
+            "mean": round(statistics.mean(self.durations), 4),
+            "p50": round(statistics.median(self.durations), 4),
+            "baseline": baseline,
+            "saved_per_load": None,
+            "saved_total": None,
+        }
+        if baseline and self.profile != BASELINE_PROFILE:
+            saved = baseline["mean"] - report["mean"]
+            report["saved_per_load"] = round(saved, 4)
+            report["saved_total"] = round(saved * len(self.durations), 3)
+            log.info(
+                "Browser profile {} saved {:.2f}s on {} page loads".format(
+                    self.profile, report["saved_total"], len(self.durations)
+                )
+            )
+        path = os.path.join(BASE_DIR, PAGE_LOAD_REPORT)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        self.durations = []
+
+
+page_loads = PageLoadReport()
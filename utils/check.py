@@ -2,11 +2,13 @@ import allure
 import pytest_check
 from loguru import logger as log
 
+from utils.metrics import instrument, metrics
 from web.base_screen import BaseScreen
 
 ASSERT_PASS = "ASSERT PASS: expecting [{}] message: {}"
 
 
+@instrument(exclude=("log_failure",))
 class Check:
     """
     Soft assertions class
@@ -21,6 +23,7 @@ class Check:
         :param expected: value to check
         :param msg: to log
         """
+        metrics.set_outcome("fail")
         self.base.take_screenshot()
         log.error(
             "ASSERT FAILED: expecting [{}] actual [{}] message: {}".format(expected, actual, msg)
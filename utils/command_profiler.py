@@ -0,0 +1,237 @@
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from loguru import logger as log
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.constants import (
+    BASE_DIR,
+    COMMAND_PROFILE_FILE,
+    PROFILE_REPEAT_THRESHOLD,
+    PROFILE_TOP_TESTS,
+)
+from web.base_screen import BaseScreen
+
+WORKER_OUTPUT_KEY = "command_profile"
+IGNORED_PARAMS = ("id", "sessionId")
+NO_PAGE_METHOD = "-"
+
+
+def get_command_key(command, params):
+    """
+    Build key of a command ignoring element and session ids, so the same find inside a loop
+    of elements counts as a repeated command
+    :param command: selenium command name
+    :param params: command params
+    :return: string
+    """
+    values = {key: value for key, value in (params or {}).items() if key not in IGNORED_PARAMS}
+    return "{} {}".format(command, json.dumps(values, sort_keys=True, default=str))
+
+
+def get_page_method(frame):
+    """
+    Get the page object method that sent a command, the nearest caller that is a method of a
+    BaseScreen subclass defined outside BaseScreen, comprehensions count as their method
+    :param frame: frame of the command call
+    :return: string like JobsPage.are_address_present_on_list
+    """
+    while frame is not None:
+        name = frame.f_code.co_name
+        if not name.startswith("<") and name not in vars(BaseScreen):
+            instance = frame.f_locals.get("self")
+            if isinstance(instance, BaseScreen):
+                return "{}.{}".format(type(instance).__name__, name)
+        frame = frame.f_back
+    return NO_PAGE_METHOD
+
+
+def new_test_profile():
+    """
+    Build empty profile of a test
+    :return: dict
+    """
+    return {"count": 0, "time": 0.0, "commands": {}, "methods": {}, "repeats": {}}
+
+
+def add_count(counters, key, duration):
+    """
+    Add one call and its duration to a counter
+    :param counters: dict with key and [count, time]
+    :param key: counter key
+    :param duration: seconds
+    """
+    counter = counters.setdefault(key, [0, 0.0])
+    counter[0] += 1
+    counter[1] += duration
+
+
+class CommandProfiler:
+    """
+    Opt-in profiler of webdriver round trips per test and per page object method
+    """
+
+    def __init__(self):
+        """
+        Constructor command profiler
+        """
+        self.enabled = False
+        self.test = None
+        self.tests = {}
+        self._execute = None
+
+    def configure(self, config):
+        """
+        Apply run configuration, the webdriver hook is installed only when enabled
+        :param config: RunConfig
+        """
+        self.enabled = config.command_profile
+        if self.enabled:
+            self.install()
+
+    def install(self):
+        """
+        Hook WebDriver.execute, every Selenium and Appium command goes through it whatever the
+        connection is, live, recorded or replayed
+        """
+        if self._execute is not None:
+            return
+        self._execute = WebDriver.execute
+        profiler = self
+
+        def execute(driver, driver_command, params=None):
+            """
+            Execute command and record it on the running test profile
+            :param driver: webdriver object
+            :param driver_command: selenium command name
+            :param params: command params
+            :return: response
+            """
+            key = get_command_key(driver_command, params)
+            start = time.perf_counter()
+            try:
+                return profiler._execute(driver, driver_command, params)
+            finally:
+                profiler.add(driver_command, key, time.perf_counter() - start, sys._getframe(1))
+
+        WebDriver.execute = execute
+
+    def uninstall(self):
+        """
+        Restore original WebDriver.execute
+        """
+        if self._execute is not None:
+            WebDriver.execute = self._execute
+            self._execute = None
+
+    def start_test(self, name):
+        """
+        Attribute next commands to a test
+        :param name: test node id
+        """
+        self.test = name
+
+    def add(self, command, key, duration, frame):
+        """
+        Record a command, commands sent outside of a test are ignored
+        :param command: selenium command name
+        :param key: command key used to find repeated commands
+        :param duration: seconds
+        :param frame: frame of the command call
+        """
+        if self.test is None:
+            return
+        profile = self.tests.setdefault(self.test, new_test_profile())
+        method = get_page_method(frame)
+        profile["count"] += 1
+        profile["time"] += duration
+        add_count(profile["commands"], command, duration)
+        add_count(profile["methods"], method, duration)
+        repeat = profile["repeats"].setdefault(key, [0, method])
+        repeat[0] += 1
+
+    def merge(self, tests):
+        """
+        Merge profiles recorded by another worker
+        :param tests: dict with test node id and profile
+        """
+        self.tests.update(tests)
+
+    def report(self):
+        """
+        Build report with the tests with most round trips, totals per page object method and
+        repeated identical commands that are likely N+1 hot spots
+        :return: dict
+        """
+        methods = {}
+        hot_spots = []
+        for test, profile in self.tests.items():
+            for method, (count, duration) in profile["methods"].items():
+                total = methods.setdefault(method, {"count": 0, "time": 0.0})
+                total["count"] += count
+                total["time"] = round(total["time"] + duration, 6)
+            for key, (count, method) in profile["repeats"].items():
+                if count >= PROFILE_REPEAT_THRESHOLD:
+                    command, params = key.split(" ", 1)
+                    hot_spots.append(
+                        {
+                            "test": test,
+                            "method": method,
+                            "command": command,
+                            "params": params,
+                            "count": count,
+                        }
+                    )
+        top_tests = sorted(self.tests.items(), key=lambda item: item[1]["count"], reverse=True)
+        return {
+            "tests": [
+                {
+                    "test": test,
+                    "count": profile["count"],
+                    "time": round(profile["time"], 6),
+                    "commands": dict(
+                        sorted(profile["commands"].items(), key=lambda item: -item[1][0])
+                    ),
+                }
+                for test, profile in top_tests[:PROFILE_TOP_TESTS]
+            ],
+            "methods": dict(sorted(methods.items(), key=lambda item: -item[1]["count"])),
+            "hot_spots": sorted(hot_spots, key=lambda item: -item["count"]),
+        }
+
+    def save(self):
+        """
+        Write profile report and log its summary
+        """
+        if not self.enabled or not self.tests:
+            return
+        report = self.report()
+        path = os.path.join(BASE_DIR, COMMAND_PROFILE_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        for test in report["tests"]:
+            log.info(
+                "{} webdriver commands in {:.2f}s {}".format(
+                    test["count"], test["time"], test["test"]
+                )
+            )
+        repeated = defaultdict(lambda: [0, 0])
+        for hot_spot in report["hot_spots"]:
+            repeated[(hot_spot["method"], hot_spot["command"])][0] += hot_spot["count"]
+            repeated[(hot_spot["method"], hot_spot["command"])][1] += 1
+        for (method, command), (count, tests) in sorted(
+            repeated.items(), key=lambda item: -item[1][0]
+        ):
+            log.warning(
+                "Possible N+1: {} repeats {}, {} identical calls in {} tests".format(
+                    method, command, count, tests
+                )
+            )
+        log.info("Saved webdriver command profile to {}".format(path))
+
+
+profiler = CommandProfiler()
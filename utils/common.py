@@ -1,6 +1,7 @@
 import datetime as dt
 import os
 import random
+import subprocess
 from datetime import datetime
 
 import allure
@@ -8,7 +9,7 @@ from dateutil.relativedelta import relativedelta
 from dotenv import load_dotenv
 from loguru import logger as log
 
-from utils.constants import BROWSERS, DEFAULT_FORMAT_DATE, ENVS, INCORRECT_ENV_VAR
+from utils.constants import DEFAULT_FORMAT_DATE
 
 load_dotenv()
 
@@ -81,28 +82,21 @@ def get_env_var(var, default=None):
     return os.getenv(var, default)
 
 
-def get_env():
+def get_worker_id():
     """
-    Get environment for the execution
-    :return: String with env value
+    Get xdist worker id of current process
+    :return: worker id like gw0, or master when tests do not run on xdist workers
     """
-    env = get_env_var("ENV", default="dev").lower()
-    if env in ENVS:
-        return env
-    else:
-        raise ValueError(INCORRECT_ENV_VAR.format("env"))
+    return get_env_var("PYTEST_XDIST_WORKER", default="master")
 
 
-def get_env_browser():
+def execute_command(command):
     """
-    Get environment for the execution
-    :return: String with env value
+    Execute shell command
+    :param command: to run
+    :return: result of command execution
     """
-    browser = get_env_var("BROWSER", default="chrome").lower()
-    if browser in BROWSERS:
-        return browser
-    else:
-        raise ValueError(INCORRECT_ENV_VAR.format("driver"))
+    return subprocess.run(command, stdout=subprocess.PIPE).stdout.decode("utf-8")
 
 
 def get_random_from_list(lst):
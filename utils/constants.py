@@ -13,17 +13,60 @@ NO_WAIT = 0
 SHORT_WAIT_TIME = 5
 MEDIUM_WAIT_TIME = 15
 LONG_WAIT_TIME = 30
+NETWORK_IDLE_TIME = 0.5
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 0.5
+SCRIPT_TIMEOUT_MARGIN = 5
+DEFAULT_TEST_DURATION = 1.0
+DURATION_SMOOTHING = 0.5
+SHORT_TEST_DURATION = 0.5
+SHORT_TESTS_CHUNK = 10
+API_TIMEOUT = 30
+STREAM_CHUNK_SIZE = 64 * 1024
+API_POOL_SIZE = 10
+API_RETRIES = 3
+API_BACKOFF = 0.5
+IDEMPOTENT_METHODS = ["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE"]
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+SCREENSHOT_MAX_PER_TEST = 5
+POOL_MAX_USES = 20
 DEFAULT_FORMAT_DATE = "%m/%d/%Y"
 API_FORMAT_DATE = "%Y-%m-%d"
 XRAY_DATE = "%Y-%m-%dT%H:%M:%S%z"
+XRAY_MAX_TESTS = 100
+XRAY_MAX_PAYLOAD = 1000000
+XRAY_TOKEN_TTL = 23 * 60 * 60
 
-TEST_DATA = "data_source/test_data.json"
-ENV_DATA = "data_source/{}_data.json"
+CACHE_DIR = "output/.cache"
+TEST_DATA = "resources/test_data.json"
+ENV_DATA = "resources/{}_data.json"
+DATASETS_DIR = "resources/datasets"
+RECORDINGS_DIR = "resources/recordings"
+METRICS_JSON = "output/metrics.json"
+METRICS_PROM = "output/metrics.prom"
+METRICS_QUANTILES = [0.5, 0.95, 0.99]
+COMMAND_PROFILE_FILE = "output/command_profile.json"
+PROFILE_REPEAT_THRESHOLD = 3
+PROFILE_TOP_TESTS = 10
+BROWSER_CACHE_DIR = "output/.cache/browser"
+PAGE_LOAD_REPORT = "output/page_load.json"
+ASSET_CACHE_DIR = "output/.cache/assets"
+ASSET_CACHE_TTL = 24 * 60 * 60
+NETWORK_REPORT = "output/network.json"
+CDP_MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+STATIC_RESOURCE_TYPES = ["Script", "Stylesheet", "Image", "Font"]
 # Capabilities section
 PACKAGE = "com.disney.wdpro.dlr"
 ACTIVITY = "com.disney.wdpro.park.activities.SplashActivity"
 ANDROID = "android"
 IOS = "ios"
+ADB = "adb"
+DEVICE_CACHE_TTL = 10 * 60
+DEVICE_LEASE_TIMEOUT = 30 * 60
+DEVICE_LEASE_POLL = 2
+APPIUM_HOST = "0.0.0.0"
+APPIUM_PORT = 4723
+SYSTEM_PORT = 8200
 
 # Validation messages
 ELEMENT_DISPLAYED = "Element {} is displayed"
@@ -41,6 +84,13 @@ BY_RESOURCE = 'new UiSelector().resourceIdMatches(".*{}")'
 # Pages or commons
 BROWSERS = ["chrome", "firefox"]
 ENVS = ["dev", "qa", "uat"]
+SCREENSHOT_MODES = ["always", "final"]
+WAIT_STRATEGIES = ["event", "poll", "webdriver"]
+XRAY_MODES = ["batch", "per_test"]
+WEBDRIVER_TRANSPORTS = ["live", "record", "replay"]
+BROWSER_PROFILES = ["default", "fast"]
+PAGE_LOAD_STRATEGIES = ["normal", "eager", "none"]
+READINESS_STRATEGIES = ["load", "ready_state", "network_idle"]
 
 
 class WindowSize(Enum):
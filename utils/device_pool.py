@@ -0,0 +1,143 @@
+import os
+import time
+from dataclasses import dataclass
+
+from loguru import logger as log
+
+from utils.common import get_worker_id
+from utils.constants import DEVICE_LEASE_POLL, DEVICE_LEASE_TIMEOUT
+from utils.devices import Device, devices
+from utils.file_cache import get_cache_path, locked_json
+from utils.run_config import get_run_config
+
+LEASES = "device_leases.json"
+
+
+@dataclass(frozen=True)
+class DeviceLease:
+    """
+    Device assigned to a worker with its own Appium server and driver port, UiAutomator2
+    systemPort on android and WebDriverAgent local port on ios
+    """
+
+    device: Device
+    appium_url: str
+    system_port: int
+
+
+def get_free_slot(leases):
+    """
+    Get lowest slot not used by an active lease, slots of running tests never move when
+    devices are attached or removed
+    :param leases: dict with device serial and lease record
+    :return: slot number
+    """
+    used = {lease.get("slot") for lease in leases.values()}
+    return next(slot for slot in range(len(leases) + 1) if slot not in used)
+
+
+def is_process_alive(pid):
+    """
+    Check if process holding a lease is still running
+    :param pid: process id
+    :return: boolean
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DevicePool:
+    """
+    Schedule attached devices of the execution platform between xdist workers, one test per
+    device at a time. Workers wait in queue when every device is busy
+    """
+
+    def __init__(self, timeout=DEVICE_LEASE_TIMEOUT, poll=DEVICE_LEASE_POLL):
+        """
+        Constructor device pool
+        :param timeout: seconds a worker waits for a free device
+        :param poll: seconds between checks for a free device
+        """
+        self.timeout = timeout
+        self.poll = poll
+        self.lease = None
+
+    @staticmethod
+    def _get_lease(slot, device):
+        """
+        Build lease with ports derived from the lease slot
+        :param slot: slot stored with the lease
+        :param device: Device
+        :return: DeviceLease
+        """
+        config = get_run_config()
+        url = "http://{}:{}/wd/hub".format(config.appium_host, config.appium_port + slot)
+        return DeviceLease(device, url, config.system_port + slot)
+
+    def _try_acquire(self, worker):
+        """
+        Lease first free device, preferring the one the worker used before
+        :param worker: worker id
+        :return: DeviceLease or None if all devices are busy
+        """
+        platform = get_run_config().execute_on
+        attached = sorted(devices.get_devices(platform), key=lambda device: device.serial)
+        if not attached:
+            raise TypeError("There is no device connected")
+        with locked_json(get_cache_path(LEASES)) as state:
+            leases, last = state.setdefault("leases", {}), state.setdefault("last", {})
+            for serial, lease in list(leases.items()):
+                if not is_process_alive(lease["pid"]):
+                    log.warning("Releasing device {} held by dead worker".format(serial))
+                    del leases[serial]
+            free = [device for device in attached if device.serial not in leases]
+            if not free:
+                return None
+            device = next(
+                (device for device in free if last.get(worker) == device.serial), free[0]
+            )
+            slot = get_free_slot(leases)
+            leases[device.serial] = {
+                "worker": worker,
+                "pid": os.getpid(),
+                "time": time.time(),
+                "slot": slot,
+            }
+            last[worker] = device.serial
+        return self._get_lease(slot, device)
+
+    def acquire(self):
+        """
+        Lease a device for current worker, waiting in queue if every device is busy
+        :return: DeviceLease
+        """
+        worker = get_worker_id()
+        end = time.monotonic() + self.timeout
+        while True:
+            self.lease = self._try_acquire(worker)
+            if self.lease:
+                log.info("Worker {} got device {}".format(worker, self.lease.device.serial))
+                return self.lease
+            if time.monotonic() > end:
+                raise TimeoutError("No device was free after {} seconds".format(self.timeout))
+            log.debug("Every device is busy, worker {} waiting".format(worker))
+            time.sleep(self.poll)
+
+    def release(self):
+        """
+        Release device leased by current worker
+        """
+        if self.lease:
+            with locked_json(get_cache_path(LEASES)) as state:
+                leases = state.get("leases", {})
+                if leases.get(self.lease.device.serial, {}).get("pid") == os.getpid():
+                    del leases[self.lease.device.serial]
+            self.lease = None
+
+
+device_pool = DevicePool()
@@ -0,0 +1,152 @@
+import re
+import time
+from dataclasses import asdict, dataclass
+
+from loguru import logger as log
+
+from utils.common import execute_command, get_env_var
+from utils.constants import ADB, ANDROID, DEVICE_CACHE_TTL, IOS
+from utils.file_cache import get_cache_path, locked_json
+
+DEVICE_CACHE = "devices.json"
+IOS_DEVICE = re.compile(r"^(?P<name>.+?) \((?P<version>[\d.]+)\) \((?P<udid>[\w-]+)\)")
+
+
+@dataclass(frozen=True)
+class Device:
+    """
+    Attached mobile device
+    """
+
+    serial: str
+    model: str
+    os_version: str
+    platform: str
+
+
+def get_adb():
+    """
+    Get adb binary, ADB_PATH env variable allows to use another one
+    :return: adb command
+    """
+    return get_env_var("ADB_PATH", default=ADB)
+
+
+def adb(*args, serial=None):
+    """
+    Run adb command
+    :param args: adb arguments
+    :param serial: device serial to target
+    :return: command output
+    """
+    command = [get_adb()] + (["-s", serial] if serial else []) + list(args)
+    return execute_command(command).strip()
+
+
+def parse_adb_devices(output):
+    """
+    Parse `adb devices -l` output
+    :param output: command output
+    :return: list of tuples with serial and model, only devices ready to use
+    """
+    devices = []
+    for line in output.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 2 and fields[1] == "device":
+            props = dict(field.split(":", 1) for field in fields[2:] if ":" in field)
+            devices.append((fields[0], props.get("model", "")))
+    return devices
+
+
+def discover_android_devices():
+    """
+    Run adb to discover attached android devices
+    :return: list of Device
+    """
+    devices = []
+    for serial, model in parse_adb_devices(adb("devices", "-l")):
+        version = adb("shell", "getprop", "ro.build.version.release", serial=serial)
+        if not model:
+            model = adb("shell", "getprop", "ro.product.model", serial=serial)
+        devices.append(Device(serial, model.replace("_", " "), version, ANDROID))
+    return devices
+
+
+def discover_ios_devices():
+    """
+    Run xcrun to discover available ios devices and simulators
+    :return: list of Device
+    """
+    devices = []
+    for line in execute_command(["xcrun", "xctrace", "list", "devices"]).splitlines():
+        match = IOS_DEVICE.match(line.strip())
+        if match:
+            devices.append(Device(match["udid"], match["name"], match["version"], IOS))
+    return devices
+
+
+class DeviceRegistry:
+    """
+    Mobile device discovery done once per run and shared with xdist workers
+    """
+
+    discoverers = {ANDROID: discover_android_devices, IOS: discover_ios_devices}
+
+    def __init__(self, ttl=DEVICE_CACHE_TTL):
+        """
+        Constructor device registry
+        :param ttl: seconds a discovery is reused
+        """
+        self.ttl = ttl
+        self._devices = {}
+
+    def get_devices(self, platform, refresh=False):
+        """
+        Get attached devices from cache or discover them
+        :param platform: android or ios
+        :param refresh: ignore cached devices
+        :return: list of Device
+        """
+        if platform in self._devices and not refresh:
+            return self._devices[platform]
+        with locked_json(get_cache_path(DEVICE_CACHE)) as cache:
+            entry = cache.get(platform)
+            if refresh or not entry or time.time() - entry["time"] > self.ttl:
+                log.info("Discovering {} devices".format(platform))
+                devices = self.discoverers[platform]()
+                entry = cache[platform] = {
+                    "time": time.time(),
+                    "devices": [asdict(device) for device in devices],
+                }
+        self._devices[platform] = [Device(**device) for device in entry["devices"]]
+        return self._devices[platform]
+
+    def get_device(self, platform, serial=None):
+        """
+        Get device by serial or first attached device
+        :param platform: android or ios
+        :param serial: device serial or udid
+        :return: Device
+        """
+        for refresh in (False, True):
+            devices = self.get_devices(platform, refresh=refresh)
+            found = [device for device in devices if not serial or device.serial == serial]
+            if found:
+                return found[0]
+        if serial:
+            raise TypeError("The provided device {} is not connected".format(serial))
+        raise TypeError("There is no device connected")
+
+    def invalidate(self, platform=None):
+        """
+        Forget discovered devices, call it when a device disconnects
+        :param platform: android, ios or None for all
+        """
+        platforms = [platform] if platform else list(self.discoverers)
+        with locked_json(get_cache_path(DEVICE_CACHE)) as cache:
+            for name in platforms:
+                self._devices.pop(name, None)
+                cache.pop(name, None)
+
+
+devices = DeviceRegistry()
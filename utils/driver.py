@@ -6,13 +6,16 @@ from loguru import logger
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
 
 from config_file import get_capabilities
 from model.test_data import TestData
-from utils.common import get_env_browser, get_env_var
+from utils.browser_profile import apply_chrome_profile, apply_firefox_profile
 from utils.constants import WindowSize
+from utils.driver_resolver import start_session
+from utils.network_cache import network
+from utils.run_config import get_run_config
+from utils.webdriver_transport import transport
+from web.readiness import navigate
 
 
 def get_window_size():
@@ -20,7 +23,7 @@ def get_window_size():
     Get window size for tablet or desktop
     :return: width, height
     """
-    if get_env_var("RESPONSIVE") == WindowSize.tablet.name:
+    if get_run_config().responsive == WindowSize.tablet.name:
         width = WindowSize.tablet.value
     else:
         width = WindowSize.desktop.value
@@ -32,7 +35,6 @@ class Driver:
     Setup driver class
     """
 
-    width, height = get_window_size()
     options = None
 
     @allure.step("Init webdriver")
@@ -44,27 +46,35 @@ class Driver:
         logger.info("Init webdriver")
         driver = self._get_browser()
         driver.delete_all_cookies()
-        driver.get(TestData().get_base_url())
+        navigate(driver, driver.get, TestData().get_base_url())
         return driver
 
     @allure.step("Init appium driver")
-    def init_mobile_driver(self):
+    def init_mobile_driver(self, lease=None):
         """
         Init Mobile driver
+        :param lease: DeviceLease with device and Appium server to use
         :return: appium driver object
         """
-        return appium_driver.Remote("http://0.0.0.0:4723/wd/hub", get_capabilities())
+        config = get_run_config()
+        url = "http://{}:{}/wd/hub".format(config.appium_host, config.appium_port)
+        if lease:
+            url = lease.appium_url
+        return appium_driver.Remote(url, get_capabilities(lease))
 
     def _get_browser(self):
         """
-        Get driver by selected driver in env variables
+        Get driver by selected driver in env variables, or from the recording when replaying
         :return: webdriver object
         """
-        browser = get_env_browser()
-        if browser == "firefox":
+        self.width, self.height = get_window_size()
+        if transport.is_replay:
+            driver = transport.replay_driver()
+        elif get_run_config().browser == "firefox":
             driver = self._get_firefox()
         else:
             driver = self._get_chrome()
+        driver = transport.attach(driver)
         driver.set_window_size(self.width, self.height)
         return driver
 
@@ -79,23 +89,35 @@ class Driver:
         Get Chrome driver
         :return: webdriver object
         """
+        config = get_run_config()
         self.options = webdriver.ChromeOptions()
-        if bool(int(get_env_var("HEADLESS", default=1))):
+        if config.headless:
             self._add_headless()
             self.options.add_argument("--window-size={}x{}".format(self.width, self.height))
-        return webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()), options=self.options
+        apply_chrome_profile(self.options, config)
+        driver = start_session(
+            "chrome",
+            lambda driver_path: webdriver.Chrome(
+                service=ChromeService(driver_path), options=self.options
+            ),
         )
+        return network.attach(driver, TestData().get_blocked_hosts())
 
     def _get_firefox(self):
         """
         Get Firefox driver
         :return: webdriver object
         """
+        config = get_run_config()
         self.options = webdriver.FirefoxOptions()
-        if bool(int(get_env_var("HEADLESS", default=1))):
+        if config.headless:
             self._add_headless()
-            self.options.add_argument("--width=" + self.width)
-            self.options.add_argument("--height=" + self.height)
-        service = FirefoxService(GeckoDriverManager().install(), log_path=path.devnull)
-        return webdriver.Firefox(service=service, options=self.options)
+            self.options.add_argument("--width={}".format(self.width))
+            self.options.add_argument("--height={}".format(self.height))
+        apply_firefox_profile(self.options, config)
+        return start_session(
+            "firefox",
+            lambda driver_path: webdriver.Firefox(
+                service=FirefoxService(driver_path, log_path=path.devnull), options=self.options
+            ),
+        )
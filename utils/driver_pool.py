@@ -0,0 +1,168 @@
+import allure
+from loguru import logger as log
+from selenium.common.exceptions import WebDriverException
+
+from model.test_data import TestData
+from utils.constants import POOL_MAX_USES
+from utils.driver import get_window_size
+from utils.run_config import get_run_config
+from web.locators import locators
+from web.readiness import navigate
+
+CLEAR_STORAGE = "window.localStorage.clear(); window.sessionStorage.clear();"
+
+
+class PooledSession:
+    """
+    Live webdriver session kept by the pool
+    """
+
+    def __init__(self, driver):
+        """
+        Constructor pooled session
+        :param driver: webdriver object
+        """
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Per worker pool of one live webdriver session reset between tests. A worker runs its tests
+    one after the other and web_setup holds the session for a single test, so there is never
+    more than one session to keep
+    """
+
+    def __init__(self, factory, max_uses=POOL_MAX_USES):
+        """
+        Constructor driver pool
+        :param factory: callable that creates a new webdriver object
+        :param max_uses: number of tests before a session is recycled
+        """
+        self.factory = factory
+        self.max_uses = max_uses
+        self._idle = None
+        self._in_use = {}
+
+    @allure.step("Acquire webdriver from pool")
+    def acquire(self):
+        """
+        Get a clean webdriver session, creating one if there is no idle session
+        :return: webdriver object
+        """
+        session, self._idle = self._idle, None
+        if session is not None and not self._reset(session.driver):
+            self._quit(session.driver)
+            session = None
+        if session is None:
+            log.info("Creating new pooled webdriver session")
+            session = PooledSession(self.factory())
+        session.uses += 1
+        self._in_use[id(session.driver)] = session
+        return session.driver
+
+    def release(self, driver, crashed=False):
+        """
+        Give back a webdriver session to the pool or recycle it
+        :param driver: webdriver object
+        :param crashed: true if the test left the session in a broken state
+        """
+        session = self._in_use.pop(id(driver), None)
+        if session is None:
+            self._quit(driver)
+        elif crashed or session.uses >= self.max_uses or self._idle is not None:
+            log.info("Recycling webdriver session after {} tests".format(session.uses))
+            self._quit(session.driver)
+        else:
+            self._idle = session
+
+    def close_all(self):
+        """
+        Quit every session kept by the pool
+        """
+        sessions = list(self._in_use.values())
+        if self._idle is not None:
+            sessions.append(self._idle)
+        for session in sessions:
+            self._quit(session.driver)
+        self._idle = None
+        self._in_use.clear()
+
+    @staticmethod
+    def is_alive(driver):
+        """
+        Check if webdriver session still answers commands
+        :param driver: webdriver object
+        :return: true if session is alive
+        """
+        try:
+            return bool(driver.window_handles)
+        except WebDriverException:
+            return False
+
+    def _reset(self, driver):
+        """
+        Reset session state: extra tabs, frames, cookies, web storage and window size
+        :param driver: webdriver object
+        :return: true if session was reset, false if it crashed
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+            driver.delete_all_cookies()
+            driver.execute_script(CLEAR_STORAGE)
+            driver.set_window_size(*get_window_size())
+            locators.invalidate_viewport()
+            navigate(driver, driver.get, TestData().get_base_url())
+            return True
+        except WebDriverException as error:
+            log.warning("Pooled webdriver session crashed, recycling it: {}".format(error.msg))
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        """
+        Quit webdriver ignoring errors of already closed sessions
+        :param driver: webdriver object
+        """
+        try:
+            driver.quit()
+        except WebDriverException as error:
+            log.trace(error)
+
+
+_pool = None
+
+
+def get_driver_pool(factory):
+    """
+    Get the driver pool of the current worker process
+    :param factory: callable that creates a new webdriver object
+    :return: driver pool
+    """
+    global _pool
+    if _pool is None:
+        config = get_run_config()
+        _pool = DriverPool(factory, max_uses=config.pool_max_uses)
+    return _pool
+
+
+def close_driver_pool():
+    """
+    Quit all sessions of the worker driver pool if it was created
+    """
+    if _pool is not None:
+        _pool.close_all()
+
+
+def is_pool_enabled():
+    """
+    Check if pooled driver mode is enabled, recorded and replayed runs need a session per test
+    :return: true if DRIVER_POOL is enabled
+    """
+    config = get_run_config()
+    return config.driver_pool and config.webdriver_transport == "live"
@@ -0,0 +1,80 @@
+import os
+from typing import Dict
+
+from loguru import logger as log
+from selenium.common.exceptions import SessionNotCreatedException
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+
+from utils.common import get_env_var
+from utils.file_cache import get_cache_path, locked_json
+
+DRIVER_CACHE = "drivers.json"
+PINNED_DRIVERS = {"chrome": "CHROMEDRIVER_PATH", "firefox": "GECKODRIVER_PATH"}
+MANAGERS = {"chrome": ChromeDriverManager, "firefox": GeckoDriverManager}
+
+_resolved: Dict[str, str] = {}
+
+
+def _get_pinned_path(browser):
+    """
+    Get local driver binary pinned by env variable
+    :param browser: browser name
+    :return: binary path or None
+    """
+    path = get_env_var(PINNED_DRIVERS[browser])
+    if path and not os.path.isfile(path):
+        raise FileNotFoundError("Pinned {} driver not found: {}".format(browser, path))
+    return path
+
+
+def resolve_driver_path(browser):
+    """
+    Resolve driver binary once per run, sharing result with all xdist workers
+    :param browser: browser name, chrome or firefox
+    :return: driver binary path
+    """
+    if browser in _resolved:
+        return _resolved[browser]
+    path = _get_pinned_path(browser)
+    if not path:
+        with locked_json(get_cache_path(DRIVER_CACHE)) as cache:
+            path = cache.get(browser)
+            if not path or not os.path.isfile(path):
+                log.info("Resolving {} driver with webdriver manager".format(browser))
+                path = cache[browser] = MANAGERS[browser]().install()
+    log.info("Using {} driver {}".format(browser, path))
+    _resolved[browser] = path
+    return path
+
+
+def clear_driver_cache(browser, path):
+    """
+    Forget a resolved driver binary so it is resolved again, only if no other worker already
+    replaced it
+    :param browser: browser name, chrome or firefox
+    :param path: driver binary path that failed
+    """
+    _resolved.pop(browser, None)
+    with locked_json(get_cache_path(DRIVER_CACHE)) as cache:
+        if cache.get(browser) == path:
+            del cache[browser]
+
+
+def start_session(browser, start):
+    """
+    Start a webdriver session with the resolved driver binary. A cached binary that can not
+    start a session, like after a browser upgrade, is resolved again once
+    :param browser: browser name, chrome or firefox
+    :param start: callable(driver_path) returning a webdriver object
+    :return: webdriver object
+    """
+    path = resolve_driver_path(browser)
+    try:
+        return start(path)
+    except SessionNotCreatedException as error:
+        if _get_pinned_path(browser):
+            raise
+        log.warning("Cached {} driver can not start a session: {}".format(browser, error.msg))
+        clear_driver_cache(browser, path)
+        return start(resolve_driver_path(browser))
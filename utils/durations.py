@@ -0,0 +1,99 @@
+import statistics
+from collections import defaultdict
+
+from utils.constants import DEFAULT_TEST_DURATION, DURATION_SMOOTHING
+from utils.file_cache import get_cache_path, locked_json, read_json_file
+
+DURATIONS = "durations.json"
+
+
+def predict_entry(entry):
+    """
+    Predict next run time of a test from its history entry. A test that failed last time or
+    never passed gets the longest of its passed and failed times, so tests running until a
+    timeout are scheduled first
+    :param entry: dict with duration, failed_duration and last outcome
+    :return: seconds
+    """
+    passed, failed = entry.get("duration"), entry.get("failed_duration")
+    if passed is None or (entry.get("outcome") == "failed" and failed is not None):
+        return max(time for time in (passed, failed) if time is not None)
+    return passed
+
+
+class DurationHistory:
+    """
+    Local store of per test wall time and outcome keyed by environment and nodeid
+    """
+
+    def __init__(self, env, path=None):
+        """
+        Constructor duration history
+        :param env: environment name
+        :param path: history file, shared cache dir by default
+        """
+        self.env = env
+        self.path = path or get_cache_path(DURATIONS)
+        self._current = defaultdict(float)
+        self._outcomes = {}
+        self._history = None
+
+    def add_report(self, report):
+        """
+        Add phase duration and outcome of a test report, setup, call and teardown are summed.
+        Only the last attempt of a rerun test counts, each setup starts the sum again
+        :param report: pytest TestReport
+        """
+        if report.when == "setup":
+            self._current[report.nodeid] = 0.0
+            self._outcomes[report.nodeid] = "passed"
+        self._current[report.nodeid] += report.duration
+        if report.failed:
+            self._outcomes[report.nodeid] = "failed"
+        elif report.skipped and self._outcomes.get(report.nodeid) != "failed":
+            self._outcomes[report.nodeid] = "skipped"
+
+    def save(self):
+        """
+        Merge durations and outcomes of this run into the history, passed and failed run times
+        are smoothed apart as a failing test may end early or run until a timeout
+        """
+        if not self._current:
+            return
+        with locked_json(self.path) as history:
+            tests = history.setdefault(self.env, {})
+            for nodeid, duration in self._current.items():
+                outcome = self._outcomes.get(nodeid, "passed")
+                entry = tests.get(nodeid) or {}
+                key = "failed_duration" if outcome == "failed" else "duration"
+                if entry.get(key) is not None:
+                    duration = (
+                        DURATION_SMOOTHING * duration + (1 - DURATION_SMOOTHING) * entry[key]
+                    )
+                entry.update(
+                    {key: round(duration, 3), "outcome": outcome, "runs": entry.get("runs", 0) + 1}
+                )
+                tests[nodeid] = entry
+        self._current.clear()
+        self._outcomes.clear()
+
+    def get_durations(self):
+        """
+        Get predicted durations of current environment
+        :return: dict with nodeid and seconds
+        """
+        if self._history is None:
+            tests = read_json_file(self.path, default={}).get(self.env, {})
+            self._history = {nodeid: predict_entry(entry) for nodeid, entry in tests.items()}
+        return self._history
+
+    def predict(self, nodeids):
+        """
+        Predict duration of tests, unknown tests get the median of the known ones
+        :param nodeids: list of test nodeids
+        :return: list of seconds
+        """
+        durations = self.get_durations()
+        known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+        default = statistics.median(known) if known else DEFAULT_TEST_DURATION
+        return [durations.get(nodeid, default) for nodeid in nodeids]
@@ -0,0 +1,61 @@
+import json
+import os
+from contextlib import contextmanager
+
+from filelock import FileLock
+
+from utils.constants import BASE_DIR, CACHE_DIR
+
+
+def get_cache_path(name):
+    """
+    Get path of a run cache file shared by all the xdist workers
+    :param name: file name
+    :return: string with full path
+    """
+    cache_dir = os.path.join(BASE_DIR, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, name)
+
+
+def read_json_file(path, default=None):
+    """
+    Read json file without lock
+    :param path: file path
+    :param default: value returned when file does not exist or is corrupted
+    :return: json content
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_file(path, content, mode=0o666):
+    """
+    Write json file atomically so readers never see partial content
+    :param path: file path
+    :param content: json serializable object
+    :param mode: permissions the file is created with before any content is written
+    """
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "w") as f:
+        json.dump(content, f)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def locked_json(path, default=None, mode=0o666):
+    """
+    Open a json file under an inter process lock, changes on the yielded dict are saved on exit
+    :param path: file path
+    :param default: initial content when file does not exist
+    :param mode: permissions the file is written with
+    :return: dict with file content
+    """
+    with FileLock("{}.lock".format(path)):
+        content = read_json_file(path, default={} if default is None else default)
+        yield content
+        write_json_file(path, content, mode)
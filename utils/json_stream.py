@@ -0,0 +1,196 @@
+import codecs
+import json
+
+from utils.constants import STREAM_CHUNK_SIZE
+
+WHITESPACE = " \t\n\r"
+
+
+class JsonStreamReader:
+    """
+    Incremental json reader that walks to an array and yields its items one by one, only the
+    item being decoded is kept in memory
+    """
+
+    def __init__(self, fp, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Constructor json stream reader
+        :param fp: binary file-like object, like response.raw or an open file
+        :param chunk_size: bytes read on every call
+        """
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read(self, size=None):
+        """
+        Read next chunk into the buffer dropping already consumed text
+        :param size: bytes to read, chunk size by default
+        :return: false if there was nothing more to read
+        """
+        if self.eof:
+            return False
+        data = self.fp.read(size or self.chunk_size)
+        consumed, self.pos = self.pos, 0
+        if not data:
+            self.eof = True
+            self.buffer = self.buffer[consumed:] + self.decoder.decode(b"", final=True)
+        else:
+            self.buffer = self.buffer[consumed:] + self.decoder.decode(data)
+        return True
+
+    def _peek(self):
+        """
+        Get next non whitespace char without consuming it
+        :return: char or empty string at the end of the document
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                return ""
+
+    def _expect(self, chars):
+        """
+        Consume next non whitespace char that must be one of chars
+        :param chars: valid chars
+        :return: consumed char
+        """
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                "Expected one of '{}' at stream position, got '{}'".format(chars, char)
+            )
+        self.pos += 1
+        return char
+
+    def _decode_value(self):
+        """
+        Decode next complete json value, reading more data until it is complete
+        :return: decoded value
+        """
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read(size)
+            size *= 2
+
+    def _skip_value(self):
+        """
+        Skip next json value without building it, nested containers are streamed through
+        """
+        char = self._peek()
+        if char not in '{["':
+            self._decode_value()
+            return
+        depth, in_string, escaped = 0, False, False
+        while True:
+            while self.pos >= len(self.buffer):
+                if not self._read():
+                    raise ValueError("Unexpected end of json stream")
+            char = self.buffer[self.pos]
+            self.pos += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 0:
+                        return
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _find_key(self, key):
+        """
+        Walk object members until the given key, skipping other values
+        :param key: member name
+        :return: true if key was found, position is left at its value
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return False
+        while True:
+            name = self._decode_value()
+            self._expect(":")
+            if name == key:
+                return True
+            self._skip_value()
+            if self._expect(",}") == "}":
+                return False
+
+    def _close_object(self):
+        """
+        Skip remaining members of the object the position is in, up to its closing brace
+        """
+        while self._expect(",}") == ",":
+            self._decode_value()
+            self._expect(":")
+            self._skip_value()
+
+    def _close_document(self, depth):
+        """
+        Read the rest of the document after the array so truncated or malformed input raises
+        :param depth: number of objects the array is nested in
+        """
+        for _ in range(depth):
+            self._close_object()
+        if self._peek():
+            raise ValueError("Unexpected data after json document")
+
+    def iter_items(self, path=""):
+        """
+        Yield items of the array at path as they arrive, a null array yields nothing. The rest
+        of the document is read once the array ends, so truncated input raises
+        :param path: dotted member path like data.items, empty for a root array
+        :return: iterator of items
+        """
+        keys = [key for key in path.split(".") if key]
+        for key in keys:
+            if not self._find_key(key):
+                raise KeyError("Member {} of path {} not found in json stream".format(key, path))
+        if self._peek() == "n":
+            self._decode_value()
+        else:
+            self._expect("[")
+            if self._peek() == "]":
+                self.pos += 1
+            else:
+                while True:
+                    yield self._decode_value()
+                    if self._expect(",]") == "]":
+                        break
+        self._close_document(len(keys))
+
+
+def iter_json_array(fp, path="", chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream items of a json array from a binary file-like object with bounded memory
+    :param fp: binary file-like object, like response.raw or an open file
+    :param path: dotted member path like data.items, empty for a root array
+    :param chunk_size: bytes read on every call
+    :return: iterator of items
+    """
+    return JsonStreamReader(fp, chunk_size).iter_items(path)
@@ -0,0 +1,337 @@
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from loguru import logger as log
+
+from utils.constants import BASE_DIR, METRICS_JSON, METRICS_PROM, METRICS_QUANTILES
+
+WORKER_OUTPUT_KEY = "metrics_samples"
+PROM_PREFIX = "uaf"
+
+
+def percentile(values, quantile):
+    """
+    Get nearest rank percentile
+    :param values: sorted list of numbers
+    :param quantile: value between 0 and 1
+    :return: number
+    """
+    index = min(len(values) - 1, max(0, math.ceil(quantile * len(values)) - 1))
+    return values[index]
+
+
+def get_stats(samples):
+    """
+    Aggregate samples of one group
+    :param samples: list of samples
+    :return: dict with count, total, wait, percentiles and outcomes
+    """
+    durations = sorted(sample[3] for sample in samples)
+    outcomes = defaultdict(int)
+    for sample in samples:
+        outcomes[sample[5]] += 1
+    wait = sum(sample[4] for sample in samples)
+    stats = {
+        "count": len(durations),
+        "total": round(sum(durations), 6),
+        "wait": round(wait, 6),
+        "action": round(sum(durations) - wait, 6),
+        "max": round(durations[-1], 6),
+        "outcomes": dict(outcomes),
+    }
+    for quantile in METRICS_QUANTILES:
+        stats["p{}".format(int(quantile * 100))] = round(percentile(durations, quantile), 6)
+    return stats
+
+
+def get_target(args, kwargs):
+    """
+    Get locator value of a screen action
+    :param args: positional arguments without self
+    :param kwargs: keyword arguments
+    :return: string or None
+    """
+    locator = args[0] if args else kwargs.get("locator", kwargs.get("locator_info"))
+    if isinstance(locator, tuple) and len(locator) > 1:
+        return str(locator[1])
+    return None
+
+
+class Step:
+    """
+    Framework action being measured
+    """
+
+    __slots__ = ("action", "target", "start", "wait", "outcome")
+
+    def __init__(self, action, target):
+        """
+        Constructor step
+        :param action: action name like BaseScreen._click_on_element
+        :param target: locator or endpoint
+        """
+        self.action = action
+        self.target = target
+        self.start = time.perf_counter()
+        self.wait = 0.0
+        self.outcome = "pass"
+
+
+class MetricsRecorder:
+    """
+    Record duration, wait time and outcome of framework actions per test
+    """
+
+    def __init__(self):
+        """
+        Constructor metrics recorder
+        """
+        self.enabled = True
+        self.test = None
+        self.samples = []
+        self._local = threading.local()
+
+    def configure(self, config):
+        """
+        Apply run configuration
+        :param config: RunConfig
+        """
+        self.enabled = config.metrics
+
+    def start_test(self, name):
+        """
+        Attribute next samples to a test
+        :param name: test node id
+        """
+        self.test = name
+
+    def _stack(self):
+        """
+        Get steps running on the current thread
+        :return: list of steps
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def measure(self, action, target, func, *args, **kwargs):
+        """
+        Run action and record its sample
+        :param action: action name
+        :param target: locator or endpoint
+        :param func: callable
+        :param args: positional arguments
+        :param kwargs: keyword arguments
+        :return: callable result
+        """
+        stack = self._stack()
+        step = Step(action, target)
+        stack.append(step)
+        try:
+            return func(*args, **kwargs)
+        except AssertionError:
+            step.outcome = "fail"
+            raise
+        except Exception:
+            step.outcome = "error"
+            raise
+        finally:
+            stack.pop()
+            duration = time.perf_counter() - step.start
+            self.samples.append(
+                (self.test, action, target, duration, min(step.wait, duration), step.outcome)
+            )
+
+    @contextmanager
+    def waiting(self):
+        """
+        Count the time spent inside the block as wait time of the running steps
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            for step in self._stack():
+                step.wait += elapsed
+
+    def set_outcome(self, outcome):
+        """
+        Set outcome of the innermost running step, like a soft assertion that failed
+        :param outcome: pass, fail or error
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1].outcome = outcome
+
+    def merge(self, samples):
+        """
+        Merge samples recorded by another worker
+        :param samples: list of samples
+        """
+        self.samples.extend(tuple(sample) for sample in samples)
+
+    def summary(self):
+        """
+        Aggregate samples per action, per action and target, and per test
+        :return: dict
+        """
+        actions, targets, tests = defaultdict(list), defaultdict(list), defaultdict(list)
+        for sample in self.samples:
+            actions[sample[1]].append(sample)
+            if sample[2] is not None:
+                targets[(sample[1], sample[2])].append(sample)
+            tests[(sample[0], sample[1])].append(sample)
+        summary = {"actions": {}, "targets": {}, "tests": {}}
+        for action, samples in sorted(actions.items()):
+            summary["actions"][action] = get_stats(samples)
+        for (action, target), samples in sorted(targets.items()):
+            summary["targets"].setdefault(action, {})[target] = get_stats(samples)
+        for (test, action), samples in sorted(tests.items(), key=lambda item: str(item[0])):
+            summary["tests"].setdefault(str(test), {})[action] = get_stats(samples)
+        return summary
+
+    def save(self):
+        """
+        Write aggregated metrics to json and to a prometheus textfile
+        """
+        if not self.samples:
+            return
+        summary = self.summary()
+        json_path = os.path.join(BASE_DIR, METRICS_JSON)
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(BASE_DIR, METRICS_PROM), "w") as f:
+            f.write(to_prometheus(summary))
+        log.info("Saved metrics of {} steps to {}".format(len(self.samples), json_path))
+
+
+def escape_label(value):
+    """
+    Escape prometheus label value
+    :param value: string
+    :return: escaped string
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels):
+    """
+    Build prometheus labels
+    :param labels: label names and values
+    :return: string like {action="...",target="..."}
+    """
+    return "{" + ",".join('{}="{}"'.format(k, escape_label(v)) for k, v in labels.items()) + "}"
+
+
+def to_prometheus(summary):
+    """
+    Convert summary to prometheus text exposition format
+    :param summary: dict built by MetricsRecorder.summary
+    :return: string
+    """
+    lines = []
+    groups = [("step", [({"action": a}, s) for a, s in summary["actions"].items()])]
+    groups.append(
+        (
+            "target",
+            [
+                ({"action": action, "target": target}, stats)
+                for action, targets in summary["targets"].items()
+                for target, stats in targets.items()
+            ],
+        )
+    )
+    for group, entries in groups:
+        name = "{}_{}_duration_seconds".format(PROM_PREFIX, group)
+        lines.append("# HELP {} Duration of framework {}s".format(name, group))
+        lines.append("# TYPE {} summary".format(name))
+        for labels, stats in entries:
+            for quantile in METRICS_QUANTILES:
+                quantile_labels = format_labels(**labels, quantile=quantile)
+                value = stats["p{}".format(int(quantile * 100))]
+                lines.append("{}{} {}".format(name, quantile_labels, value))
+            lines.append("{}_sum{} {}".format(name, format_labels(**labels), stats["total"]))
+            lines.append("{}_count{} {}".format(name, format_labels(**labels), stats["count"]))
+    name = "{}_step_wait_seconds_total".format(PROM_PREFIX)
+    lines.append("# HELP {} Time framework steps spent waiting for conditions".format(name))
+    lines.append("# TYPE {} counter".format(name))
+    for action, stats in summary["actions"].items():
+        lines.append("{}{} {}".format(name, format_labels(action=action), stats["wait"]))
+    name = "{}_step_outcomes_total".format(PROM_PREFIX)
+    lines.append("# HELP {} Framework steps by outcome".format(name))
+    lines.append("# TYPE {} counter".format(name))
+    for action, stats in summary["actions"].items():
+        for outcome, count in sorted(stats["outcomes"].items()):
+            lines.append(
+                "{}{} {}".format(name, format_labels(action=action, outcome=outcome), count)
+            )
+    return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRecorder()
+
+
+def instrument(include=None, exclude=(), target=get_target):
+    """
+    Class decorator that records every method defined on the class as a metrics step
+    :param include: method names to instrument, every method when None
+    :param exclude: method names that are helpers and not actions
+    :param target: callable(args, kwargs) returning locator or endpoint of the call
+    :return: decorator
+    """
+
+    def decorator(cls):
+        """
+        Wrap class methods
+        :param cls: class
+        :return: same class
+        """
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("__") or name in exclude or (include and name not in include):
+                continue
+            is_static = isinstance(attr, staticmethod)
+            func = attr.__func__ if is_static else attr
+            if not inspect.isfunction(func):
+                continue
+            wrapper = _wrap(
+                func, "{}.{}".format(cls.__name__, name), target, 0 if is_static else 1
+            )
+            setattr(cls, name, staticmethod(wrapper) if is_static else wrapper)
+        return cls
+
+    return decorator
+
+
+def _wrap(func, action, target, offset):
+    """
+    Wrap function to record it as a metrics step
+    :param func: function
+    :param action: action name
+    :param target: callable(args, kwargs) returning locator or endpoint of the call
+    :param offset: number of leading arguments to skip, 1 for self
+    :return: wrapped function
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """
+        Measure call when metrics are enabled
+        :param args: positional arguments
+        :param kwargs: keyword arguments
+        :return: function result
+        """
+        if not metrics.enabled:
+            return func(*args, **kwargs)
+        return metrics.measure(action, target(args[offset:], kwargs), func, *args, **kwargs)
+
+    return wrapper
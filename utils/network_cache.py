@@ -0,0 +1,426 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+import trio
+from loguru import logger as log
+from selenium.common.exceptions import WebDriverException
+from trio_websocket import ConnectionClosed, HandshakeError, open_websocket_url
+
+from utils.constants import (
+    ASSET_CACHE_DIR,
+    ASSET_CACHE_TTL,
+    BASE_DIR,
+    CDP_MAX_MESSAGE_SIZE,
+    NETWORK_REPORT,
+    STATIC_RESOURCE_TYPES,
+)
+from utils.file_cache import locked_json, read_json_file
+
+WORKER_OUTPUT_KEY = "network_stats"
+ASSET_INDEX = "index.json"
+# body is decoded by the browser, these headers would describe the original transfer
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+UNCACHEABLE_DIRECTIVES = ("no-store", "private")
+
+
+def is_blocked(url, hosts):
+    """
+    Check if url host is one of the blocked hosts or a subdomain of one
+    :param url: request url
+    :param hosts: list of blocked hosts
+    :return: boolean
+    """
+    host = urlparse(url).hostname or ""
+    return any(host == blocked or host.endswith("." + blocked) for blocked in hosts)
+
+
+def is_cacheable(headers):
+    """
+    Check if response headers allow storing the response in a shared cache
+    :param headers: list of dicts with name and value
+    :return: boolean
+    """
+    for header in headers:
+        if header["name"].lower() == "cache-control":
+            directives = {
+                directive.split("=")[0].strip().lower() for directive in header["value"].split(",")
+            }
+            if directives.intersection(UNCACHEABLE_DIRECTIVES):
+                return False
+    return True
+
+
+def get_fetch_patterns(hosts, cache):
+    """
+    Build Fetch.enable patterns so only requests to blocked hosts and static assets are paused,
+    documents and api calls never wait for the interceptor
+    :param hosts: list of blocked hosts
+    :param cache: true to pause static assets at request and response stage
+    :return: list of RequestPattern dicts
+    """
+    patterns = [
+        {"urlPattern": url_pattern.format(host), "requestStage": "Request"}
+        for host in hosts
+        for url_pattern in ("*://{}/*", "*://*.{}/*")
+    ]
+    if cache:
+        patterns += [
+            {"resourceType": resource_type, "requestStage": stage}
+            for resource_type in STATIC_RESOURCE_TYPES
+            for stage in ("Request", "Response")
+        ]
+    return patterns
+
+
+class AssetCache:
+    """
+    Content addressed disk cache of static assets shared by every session and worker, bodies
+    are stored once by sha256 and an index maps urls to them
+    """
+
+    def __init__(self, path=None, ttl=ASSET_CACHE_TTL):
+        """
+        Constructor asset cache
+        :param path: cache dir, output/.cache/assets by default
+        :param ttl: seconds an asset is served before it is fetched again
+        """
+        self.path = path or os.path.join(BASE_DIR, ASSET_CACHE_DIR)
+        self.ttl = ttl
+        os.makedirs(self.path, exist_ok=True)
+        self.index_path = os.path.join(self.path, ASSET_INDEX)
+        self.index = read_json_file(self.index_path, default={})
+
+    def _blob_path(self, digest):
+        """
+        Get path of a stored body
+        :param digest: sha256 hex digest
+        :return: string with full path
+        """
+        return os.path.join(self.path, digest[:2], digest)
+
+    def get(self, url):
+        """
+        Get cached asset
+        :param url: request url
+        :return: tuple with index entry and body, or None when missing or expired
+        """
+        entry = self.index.get(url)
+        if not entry or time.time() - entry["stored"] > self.ttl:
+            return None
+        try:
+            with open(self._blob_path(entry["sha256"]), "rb") as f:
+                return entry, f.read()
+        except OSError:
+            return None
+
+    def put(self, url, status, headers, body):
+        """
+        Store asset body and index entry
+        :param url: request url
+        :param status: response status code
+        :param headers: list of dicts with name and value
+        :param body: bytes
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = "{}.{}.tmp".format(blob_path, os.getpid())
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, blob_path)
+        headers = [h for h in headers if h["name"].lower() not in DROPPED_HEADERS]
+        entry = {"sha256": digest, "status": status, "headers": headers, "stored": time.time()}
+        self.index[url] = entry
+        with locked_json(self.index_path) as index:
+            index[url] = entry
+
+
+class NetworkStats:
+    """
+    Counters of blocked requests and asset cache use
+    """
+
+    FIELDS = ("blocked", "hits", "misses", "stored", "saved_bytes")
+
+    def __init__(self):
+        """
+        Constructor network stats
+        """
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, name, value=1):
+        """
+        Increase a counter, interceptors of several sessions may run at the same time
+        :param name: counter name
+        :param value: amount
+        """
+        with self._lock:
+            self.counts[name] += value
+
+    def merge(self, counts):
+        """
+        Merge counters of another worker
+        :param counts: dict with counters
+        """
+        for name, value in counts.items():
+            self.add(name, value)
+
+    def save(self):
+        """
+        Write network report and log its summary
+        """
+        if not any(self.counts.values()):
+            return
+        path = os.path.join(BASE_DIR, NETWORK_REPORT)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.counts, f, indent=2)
+        log.info(
+            "Blocked {blocked} requests, served {hits} cached assets saving {saved_bytes} bytes, "
+            "stored {stored} new assets".format(**self.counts)
+        )
+
+
+class NetworkInterceptor:
+    """
+    Chrome DevTools Protocol client that pauses page requests to block third party hosts and
+    serve static assets from the asset cache, it runs its own trio loop on a daemon thread
+    """
+
+    def __init__(self, ws_url, hosts, cache, stats):
+        """
+        Constructor network interceptor
+        :param ws_url: devtools websocket url of the page target
+        :param hosts: list of blocked hosts
+        :param cache: AssetCache or None to only block
+        :param stats: NetworkStats
+        """
+        self.ws_url = ws_url
+        self.hosts = hosts
+        self.cache = cache
+        self.stats = stats
+        self._ws = None
+        self._id = 0
+        self._events = deque()
+        self._ready = threading.Event()
+        self.error = None
+
+    def start(self, timeout=10):
+        """
+        Start interception thread and wait until Fetch domain is enabled
+        :param timeout: seconds to wait
+        :return: true if interception is running
+        """
+        threading.Thread(target=trio.run, args=(self._run,), daemon=True).start()
+        return self._ready.wait(timeout) and self.error is None
+
+    async def _run(self):
+        """
+        Connect to the page target and handle paused requests until the browser closes
+        """
+        try:
+            async with open_websocket_url(
+                self.ws_url, max_message_size=CDP_MAX_MESSAGE_SIZE
+            ) as ws:
+                self._ws = ws
+                patterns = get_fetch_patterns(self.hosts, bool(self.cache))
+                await self._call("Fetch.enable", {"patterns": patterns})
+                self._ready.set()
+                await self._handle_events()
+        except (ConnectionClosed, HandshakeError, OSError) as error:
+            self.error = error
+            log.debug("Network interception stopped: {}".format(error))
+        except Exception as error:
+            self.error = error
+            log.warning("Network interception failed: {!r}".format(error))
+        finally:
+            self._ready.set()
+
+    async def _handle_events(self):
+        """
+        Handle paused requests, on an unexpected error paused requests are continued and Fetch is
+        disabled so the page never hangs waiting for the interceptor
+        """
+        paused = []
+        try:
+            while True:
+                event = self._events.popleft() if self._events else await self._receive()
+                if event.get("method") == "Fetch.requestPaused":
+                    paused = [event["params"]["requestId"]]
+                    await self._on_request_paused(event["params"])
+                    paused = []
+        except (ConnectionClosed, HandshakeError, OSError):
+            raise
+        except Exception:
+            paused += [
+                event["params"]["requestId"]
+                for event in self._events
+                if event.get("method") == "Fetch.requestPaused"
+            ]
+            for request_id in paused:
+                await self._call("Fetch.continueRequest", {"requestId": request_id})
+            await self._call("Fetch.disable", {})
+            raise
+
+    async def _receive(self):
+        """
+        Receive next devtools message
+        :return: dict
+        """
+        return json.loads(await self._ws.get_message())
+
+    async def _call(self, method, params):
+        """
+        Send devtools command and wait for its result, events received meanwhile are queued
+        :param method: devtools method
+        :param params: dict
+        :return: result dict
+        """
+        self._id += 1
+        message_id = self._id
+        await self._ws.send_message(
+            json.dumps({"id": message_id, "method": method, "params": params})
+        )
+        while True:
+            message = await self._receive()
+            if message.get("id") == message_id:
+                return message.get("result", {})
+            self._events.append(message)
+
+    async def _on_request_paused(self, params):
+        """
+        Block, fulfill from cache, store or continue a paused request
+        :param params: Fetch.requestPaused params
+        """
+        request_id, url = params["requestId"], params["request"]["url"]
+        static = params.get("resourceType") in STATIC_RESOURCE_TYPES
+        if "responseStatusCode" in params:
+            await self._store(params)
+        elif is_blocked(url, self.hosts):
+            self.stats.add("blocked")
+            await self._call(
+                "Fetch.failRequest", {"requestId": request_id, "errorReason": "BlockedByClient"}
+            )
+            return
+        elif static and self.cache and params["request"]["method"] == "GET":
+            cached = self.cache.get(url)
+            if cached:
+                entry, body = cached
+                self.stats.add("hits")
+                self.stats.add("saved_bytes", len(body))
+                await self._call(
+                    "Fetch.fulfillRequest",
+                    {
+                        "requestId": request_id,
+                        "responseCode": entry["status"],
+                        "responseHeaders": entry["headers"],
+                        "body": base64.b64encode(body).decode("ascii"),
+                    },
+                )
+                return
+            self.stats.add("misses")
+        await self._call("Fetch.continueRequest", {"requestId": request_id})
+
+    async def _store(self, params):
+        """
+        Store body of a successful static asset response
+        :param params: Fetch.requestPaused params at response stage
+        """
+        if params["responseStatusCode"] != 200 or params["request"]["method"] != "GET":
+            return
+        if not is_cacheable(params.get("responseHeaders", [])):
+            return
+        result = await self._call("Fetch.getResponseBody", {"requestId": params["requestId"]})
+        if "body" not in result:
+            return
+        body = result["body"]
+        body = base64.b64decode(body) if result.get("base64Encoded") else body.encode("utf-8")
+        self.cache.put(
+            params["request"]["url"],
+            params["responseStatusCode"],
+            params.get("responseHeaders", []),
+            body,
+        )
+        self.stats.add("stored")
+
+
+def get_page_ws_url(driver):
+    """
+    Get devtools websocket url of the first page target of a local chrome
+    :param driver: chrome webdriver object
+    :return: string or None when devtools is not reachable
+    """
+    address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if not address:
+        return None
+    try:
+        targets = requests.get("http://{}/json/list".format(address), timeout=5).json()
+    except (requests.RequestException, ValueError):
+        return None
+    pages = [target for target in targets if target.get("type") == "page"]
+    return pages[0]["webSocketDebuggerUrl"] if pages else None
+
+
+class NetworkInterception:
+    """
+    Attach request blocking and asset caching to new chrome sessions
+    """
+
+    def __init__(self):
+        """
+        Constructor network interception
+        """
+        self.block = False
+        self.cache_enabled = False
+        self.stats = NetworkStats()
+        self._cache = None
+
+    def configure(self, config):
+        """
+        Apply run configuration
+        :param config: RunConfig
+        """
+        self.block = config.block_third_party
+        self.cache_enabled = config.asset_cache
+
+    def attach(self, driver, hosts):
+        """
+        Start interception on a new chrome session, falls back to Network.setBlockedURLs when
+        the devtools websocket is not reachable, like on a remote grid
+        :param driver: chrome webdriver object
+        :param hosts: list of blocked hosts of the environment
+        :return: same webdriver object
+        """
+        hosts = hosts if self.block else []
+        if not hosts and not self.cache_enabled:
+            return driver
+        if self.cache_enabled and self._cache is None:
+            self._cache = AssetCache()
+        ws_url = get_page_ws_url(driver)
+        if ws_url:
+            cache = self._cache if self.cache_enabled else None
+            if NetworkInterceptor(ws_url, hosts, cache, self.stats).start():
+                return driver
+        log.warning("Network interception is not available, assets are not cached")
+        if not hosts:
+            return driver
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            urls = ["*://{}/*".format(host) for host in hosts]
+            urls += ["*://*.{}/*".format(host) for host in hosts]
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+        except (WebDriverException, AttributeError) as error:
+            log.warning("Could not block hosts: {}".format(error))
+        return driver
+
+
+network = NetworkInterception()
@@ -0,0 +1,248 @@
+import dataclasses
+from typing import Optional
+
+from utils.common import get_env_var
+from utils.constants import (
+    ANDROID,
+    API_BACKOFF,
+    API_POOL_SIZE,
+    API_RETRIES,
+    API_TIMEOUT,
+    APPIUM_HOST,
+    APPIUM_PORT,
+    BROWSER_PROFILES,
+    BROWSERS,
+    ENVS,
+    INCORRECT_ENV_VAR,
+    IOS,
+    PAGE_LOAD_STRATEGIES,
+    POOL_MAX_USES,
+    READINESS_STRATEGIES,
+    SCREENSHOT_MAX_PER_TEST,
+    SCREENSHOT_MODES,
+    SYSTEM_PORT,
+    WAIT_STRATEGIES,
+    WEBDRIVER_TRANSPORTS,
+    XRAY_MODES,
+    WindowSize,
+)
+
+WORKER_INPUT_KEY = "run_config"
+
+
+def parse_bool(name, value):
+    """
+    Parse boolean env value
+    :param name: variable name used on error message
+    :param value: string value like 1, 0, true or false
+    :return: boolean
+    """
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in ("1", "true", "yes"):
+        return True
+    if value in ("0", "false", "no"):
+        return False
+    raise ValueError(INCORRECT_ENV_VAR.format(name) + "1, 0, true, false")
+
+
+def parse_choice(name, value, choices):
+    """
+    Parse value that must be one of choices
+    :param name: variable name used on error message
+    :param value: string value
+    :param choices: list of valid values
+    :return: lower case value
+    """
+    value = str(value).lower()
+    if value not in choices:
+        raise ValueError(INCORRECT_ENV_VAR.format(name) + str(choices))
+    return value
+
+
+def parse_number(name, value, number_type=int):
+    """
+    Parse numeric env value
+    :param name: variable name used on error message
+    :param value: string value
+    :param number_type: int or float
+    :return: number
+    """
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            INCORRECT_ENV_VAR.format(name) + "{} numbers".format(number_type.__name__)
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class RunConfig:
+    """
+    Immutable run configuration parsed and validated once at session start
+    """
+
+    env: str
+    browser: str
+    headless: bool
+    responsive: str
+    execute_on: str
+    execution: Optional[str]
+    screenshot: bool
+    screenshot_mode: str
+    screenshot_max: int
+    screenshot_scale: float
+    wait_strategy: str
+    driver_pool: bool
+    pool_max_uses: int
+    xray_mode: str
+    device_pool: bool
+    appium_host: str
+    appium_port: int
+    system_port: int
+    api_timeout: float
+    api_pool_size: int
+    api_retries: int
+    api_backoff: float
+    webdriver_transport: str
+    metrics: bool
+    command_profile: bool
+    browser_profile: str
+    page_load_strategy: str
+    block_third_party: bool
+    asset_cache: bool
+    readiness: str
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """
+        Build run configuration from env variables and .env file
+        :param overrides: values taking precedence over env variables, like CLI options
+        :return: RunConfig
+        """
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        browser_profile = parse_choice(
+            "BROWSER_PROFILE", get_env_var("BROWSER_PROFILE", "default"), BROWSER_PROFILES
+        )
+        values = {
+            "env": parse_choice("env", overrides.pop("env", get_env_var("ENV", "dev")), ENVS),
+            "browser": parse_choice(
+                "driver", overrides.pop("browser", get_env_var("BROWSER", "chrome")), BROWSERS
+            ),
+            "headless": parse_bool(
+                "HEADLESS", overrides.pop("headless", get_env_var("HEADLESS", default=1))
+            ),
+            "responsive": parse_choice(
+                "RESPONSIVE",
+                get_env_var("RESPONSIVE", default=WindowSize.desktop.name),
+                [WindowSize.desktop.name, WindowSize.tablet.name],
+            ),
+            "execute_on": parse_choice(
+                "EXECUTE_ON", get_env_var("EXECUTE_ON", default=ANDROID), [ANDROID, IOS]
+            ),
+            "execution": get_env_var("EXECUTION"),
+            "screenshot": parse_bool("SCREENSHOT", get_env_var("SCREENSHOT", default=True)),
+            "screenshot_mode": parse_choice(
+                "SCREENSHOT_MODE", get_env_var("SCREENSHOT_MODE", "always"), SCREENSHOT_MODES
+            ),
+            "screenshot_max": parse_number(
+                "SCREENSHOT_MAX", get_env_var("SCREENSHOT_MAX", SCREENSHOT_MAX_PER_TEST)
+            ),
+            "screenshot_scale": parse_number(
+                "SCREENSHOT_SCALE", get_env_var("SCREENSHOT_SCALE", default=1), float
+            ),
+            "wait_strategy": parse_choice(
+                "WAIT_STRATEGY", get_env_var("WAIT_STRATEGY", "event"), WAIT_STRATEGIES
+            ),
+            "driver_pool": parse_bool("DRIVER_POOL", get_env_var("DRIVER_POOL", default=0)),
+            "pool_max_uses": parse_number(
+                "POOL_MAX_USES", get_env_var("POOL_MAX_USES", default=POOL_MAX_USES)
+            ),
+            "xray_mode": parse_choice("XRAY_MODE", get_env_var("XRAY_MODE", "batch"), XRAY_MODES),
+            "device_pool": parse_bool("DEVICE_POOL", get_env_var("DEVICE_POOL", default=0)),
+            "appium_host": get_env_var("APPIUM_HOST", default=APPIUM_HOST),
+            "appium_port": parse_number(
+                "APPIUM_PORT", get_env_var("APPIUM_PORT", default=APPIUM_PORT)
+            ),
+            "system_port": parse_number(
+                "SYSTEM_PORT", get_env_var("SYSTEM_PORT", default=SYSTEM_PORT)
+            ),
+            "api_timeout": parse_number(
+                "API_TIMEOUT", get_env_var("API_TIMEOUT", default=API_TIMEOUT), float
+            ),
+            "api_pool_size": parse_number(
+                "API_POOL_SIZE", get_env_var("API_POOL_SIZE", default=API_POOL_SIZE)
+            ),
+            "api_retries": parse_number(
+                "API_RETRIES", get_env_var("API_RETRIES", default=API_RETRIES)
+            ),
+            "api_backoff": parse_number(
+                "API_BACKOFF", get_env_var("API_BACKOFF", default=API_BACKOFF), float
+            ),
+            "webdriver_transport": parse_choice(
+                "WEBDRIVER_TRANSPORT",
+                get_env_var("WEBDRIVER_TRANSPORT", default="live"),
+                WEBDRIVER_TRANSPORTS,
+            ),
+            "metrics": parse_bool("METRICS", get_env_var("METRICS", default=1)),
+            "command_profile": parse_bool(
+                "COMMAND_PROFILE", get_env_var("COMMAND_PROFILE", default=0)
+            ),
+            "browser_profile": browser_profile,
+            # fast profile returns from navigation on DOMContentLoaded unless set explicitly
+            "page_load_strategy": parse_choice(
+                "PAGE_LOAD_STRATEGY",
+                get_env_var(
+                    "PAGE_LOAD_STRATEGY", "eager" if browser_profile == "fast" else "normal"
+                ),
+                PAGE_LOAD_STRATEGIES,
+            ),
+            "block_third_party": parse_bool(
+                "BLOCK_THIRD_PARTY", get_env_var("BLOCK_THIRD_PARTY", default=0)
+            ),
+            "asset_cache": parse_bool("ASSET_CACHE", get_env_var("ASSET_CACHE", default=0)),
+            "readiness": parse_choice(
+                "READINESS", get_env_var("READINESS", "load"), READINESS_STRATEGIES
+            ),
+        }
+        values.update(overrides)
+        return cls(**values)
+
+    def to_dict(self):
+        """
+        Convert configuration to dict to send it to xdist workers
+        :return: dict
+        """
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Build configuration received from xdist controller
+        :param values: dict
+        :return: RunConfig
+        """
+        return cls(**values)
+
+
+_config = None
+
+
+def set_run_config(config):
+    """
+    Set the configuration of the current process
+    :param config: RunConfig
+    """
+    global _config
+    _config = config
+
+
+def get_run_config():
+    """
+    Get the configuration of the current process, built from env variables if not set yet
+    :return: RunConfig
+    """
+    if _config is None:
+        set_run_config(RunConfig.from_env())
+    return _config
@@ -0,0 +1,64 @@
+from xdist.scheduler import LoadScheduling
+
+from utils.constants import SHORT_TEST_DURATION, SHORT_TESTS_CHUNK
+
+
+class DurationScheduling(LoadScheduling):
+    """
+    Xdist load scheduler that sends longest predicted tests first, one at a time, so the
+    predicted load is balanced between workers. Short tests are grouped in chunks of about
+    SHORT_TEST_DURATION seconds
+    """
+
+    def __init__(self, config, log=None, history=None):
+        """
+        Constructor duration scheduling
+        :param config: pytest config
+        :param log: xdist log producer
+        :param history: DurationHistory
+        """
+        super().__init__(config, log)
+        self.history = history
+        self.predicted = []
+
+    def schedule(self):
+        """
+        Sort pending tests by predicted duration before the first distribution
+        """
+        if self.collection is None and self._check_nodes_have_same_collection():
+            self.collection = next(iter(self.node2collection.values()))
+            self.predicted = self.history.predict(self.collection)
+            self.pending[:] = sorted(
+                range(len(self.collection)), key=lambda index: -self.predicted[index]
+            )
+            if not self.collection:
+                return
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        super().schedule()
+
+    def check_schedule(self, node, duration=0):
+        """
+        Keep two tests queued on the node, the one running and the next one
+        :param node: xdist worker node
+        :param duration: duration of last test, not used
+        """
+        if node.shutting_down:
+            return
+        if not self.pending:
+            node.shutdown()
+            return
+        node_pending = self.node2pending[node]
+        num = max(2 - len(node_pending), 0)
+        if num:
+            fair_share = max(num, len(self.pending) // len(self.node2pending))
+            chunk = [self.predicted[index] for index in self.pending[:num]]
+            while (
+                num < min(len(self.pending), fair_share, SHORT_TESTS_CHUNK)
+                and sum(chunk) < SHORT_TEST_DURATION
+            ):
+                chunk.append(self.predicted[self.pending[num]])
+                num += 1
+            self._send_tests(node, num)
+        self.log("num items waiting for node:", len(self.pending))
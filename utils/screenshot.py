@@ -0,0 +1,145 @@
+import hashlib
+import io
+import os
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+from loguru import logger as log
+
+from utils.common import get_current_time
+from utils.constants import BASE_DIR
+from utils.run_config import get_run_config
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is optional
+    Image = None
+
+
+def compress_png(png, scale):
+    """
+    Downscale and recompress png, returns it untouched if Pillow is not installed
+    :param png: png bytes
+    :param scale: scale factor
+    :return: png bytes
+    """
+    if scale >= 1 or Image is None:
+        return png
+    with Image.open(io.BytesIO(png)) as image:
+        size = (max(int(image.width * scale), 1), max(int(image.height * scale), 1))
+        output = io.BytesIO()
+        image.resize(size).save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+class ScreenshotService:
+    """
+    Screenshot service: capture runs on test thread, encoding and disk writes run on a background
+    worker flushed at test teardown, where saved files are attached to allure from the test
+    thread. A per test policy skips duplicates of an unchanged viewport and caps the number of
+    screenshots
+    """
+
+    def __init__(self):
+        """
+        Constructor screenshot service
+        """
+        self.file_dir = os.path.join(BASE_DIR, "output")
+        self._taken = 0
+        self._hashes = set()
+        self._executor = None
+        self._pending = []
+        self.configure(get_run_config())
+
+    def configure(self, config):
+        """
+        Apply screenshot policy from run configuration
+        :param config: RunConfig
+        """
+        self.enabled = config.screenshot
+        self.scale = config.screenshot_scale
+        self.mode = config.screenshot_mode
+        self.max_per_test = config.screenshot_max
+        if self.scale < 1 and Image is None:
+            log.warning("SCREENSHOT_SCALE needs Pillow installed, saving original size")
+
+    def start_test(self):
+        """
+        Reset per test policy state
+        """
+        self._taken = 0
+        self._hashes = set()
+
+    def capture(self, driver, final=False):
+        """
+        Capture screenshot and queue it to be saved if policy allows it
+        :param driver: webdriver object
+        :param final: true for the screenshot of the final test failure
+        :return: true if screenshot was queued
+        """
+        if not self.enabled or driver is None or (self.mode == "final" and not final):
+            return False
+        if self._taken >= self.max_per_test and not final:
+            log.debug("Screenshot skipped, limit of {} per test reached".format(self.max_per_test))
+            return False
+        data = driver.get_screenshot_as_base64()
+        digest = hashlib.sha1(data.encode("ascii")).hexdigest()
+        if digest in self._hashes:
+            log.debug("Screenshot skipped, viewport did not change")
+            return False
+        self._hashes.add(digest)
+        self._taken += 1
+        full_file = os.path.join(self.file_dir, "{}.png".format(get_current_time()))
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot")
+        self._pending.append(self._executor.submit(self._save, data, full_file))
+        return True
+
+    def _save(self, data, full_file):
+        """
+        Decode, compress and write screenshot, allure keeps the test context on the test thread
+        so the file is attached on flush
+        :param data: base64 png string
+        :param full_file: destination path
+        :return: destination path
+        """
+        png = compress_png(b64decode(data.encode("ascii")), self.scale)
+        os.makedirs(self.file_dir, exist_ok=True)
+        with open(full_file, "wb") as f:
+            f.write(png)
+        log.warning("Screenshot taken placed in {}".format(full_file))
+        return full_file
+
+    def flush(self):
+        """
+        Wait for queued screenshots to be saved and attach them to allure, it runs on the test
+        thread
+        :return: list of saved paths
+        """
+        pending, self._pending = self._pending, []
+        saved = []
+        for future in pending:
+            try:
+                saved.append(future.result())
+            except Exception as error:
+                log.error("Screenshot could not be saved {}".format(error))
+        for full_file in saved:
+            allure.attach.file(
+                full_file,
+                name=os.path.basename(full_file),
+                attachment_type=allure.attachment_type.PNG,
+            )
+        return saved
+
+    def shutdown(self):
+        """
+        Flush pending screenshots and stop background worker
+        """
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+screenshots = ScreenshotService()
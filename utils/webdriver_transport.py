@@ -0,0 +1,267 @@
+import copy
+import json
+import os
+import re
+
+from loguru import logger as log
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from utils.constants import BASE_DIR, RECORDINGS_DIR
+from utils.file_cache import read_json_file, write_json_file
+
+RECORDING_VERSION = 1
+
+
+class ReplayMismatchError(WebDriverException):
+    """
+    Command sent while replaying differs from the recorded session
+    """
+
+
+def to_json(value):
+    """
+    Copy command params or response as plain json, selenium changes both in place
+    :param value: json serializable value
+    :return: plain json copy
+    """
+    return json.loads(json.dumps(value))
+
+
+def get_recording_path(name):
+    """
+    Get recording file path of a test
+    :param name: test node id
+    :return: string with full path
+    """
+    file_name = re.sub(r"[^\w.-]+", "_", name).strip("_") + ".json"
+    return os.path.join(BASE_DIR, RECORDINGS_DIR, file_name)
+
+
+class Recording:
+    """
+    WebDriver command and response stream of a single test session
+    """
+
+    def __init__(self, name, commands=None):
+        """
+        Constructor recording
+        :param name: test node id
+        :param commands: list of dicts with command, params and response
+        """
+        self.name = name
+        self.path = get_recording_path(name)
+        self.commands = commands if commands is not None else []
+
+    @classmethod
+    def load(cls, name):
+        """
+        Load recording of a test
+        :param name: test node id
+        :return: Recording
+        """
+        content = read_json_file(get_recording_path(name))
+        if not content or content.get("version") != RECORDING_VERSION:
+            raise ReplayMismatchError("There is no recording for {}".format(name))
+        return cls(name, content["commands"])
+
+    def add(self, command, params, response):
+        """
+        Add command to the recording
+        :param command: selenium command name
+        :param params: command params
+        :param response: command response
+        """
+        self.commands.append(
+            {"command": command, "params": to_json(params or {}), "response": to_json(response)}
+        )
+
+    def save(self):
+        """
+        Save recording file
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json_file(
+            self.path, {"version": RECORDING_VERSION, "test": self.name, "commands": self.commands}
+        )
+        log.info("Recorded {} webdriver commands to {}".format(len(self.commands), self.path))
+
+
+class RecordingConnection:
+    """
+    Command executor that forwards commands to the real connection and records them
+    """
+
+    def __init__(self, connection, recording):
+        """
+        Constructor recording connection
+        :param connection: selenium RemoteConnection of the live session
+        :param recording: Recording
+        """
+        self._connection = connection
+        self._recording = recording
+
+    def execute(self, command, params):
+        """
+        Execute command on the live session and record it
+        :param command: selenium command name
+        :param params: command params
+        :return: response
+        """
+        sent = to_json(params or {})
+        response = self._connection.execute(command, params)
+        self._recording.add(command, sent, response)
+        return response
+
+    def __getattr__(self, name):
+        """
+        Delegate other attributes to the live connection
+        :param name: attribute name
+        :return: attribute value
+        """
+        return getattr(self._connection, name)
+
+
+class ReplayConnection:
+    """
+    Command executor that answers commands from a recording without a browser
+    """
+
+    def __init__(self, recording):
+        """
+        Constructor replay connection
+        :param recording: Recording
+        """
+        self._recording = recording
+        self.position = 0
+        self.mismatch = None
+
+    @property
+    def pending(self):
+        """
+        Recorded commands not replayed yet
+        :return: list of commands
+        """
+        return self._recording.commands[self.position :]
+
+    def execute(self, command, params):
+        """
+        Answer command with the recorded response, the command must be the next recorded one
+        :param command: selenium command name
+        :param params: command params
+        :return: recorded response
+        """
+        sent = to_json(params or {})
+        if self.position >= len(self._recording.commands):
+            self.flag("Command {} {} was not recorded".format(command, sent))
+        expected = self._recording.commands[self.position]
+        # new session capabilities depend on local options, the recorded session id is reused
+        if expected["command"] != command or (
+            command != Command.NEW_SESSION and expected["params"] != sent
+        ):
+            self.flag(
+                "Command {} differs from recording, expected {} {}, got {} {}".format(
+                    self.position, expected["command"], expected["params"], command, sent
+                )
+            )
+        self.position += 1
+        return copy.deepcopy(expected["response"])
+
+    def close(self):
+        """
+        Close connection, there is nothing to release when replaying
+        """
+
+    def flag(self, message):
+        """
+        Flag the replay as diverged
+        :param message: mismatch description
+        """
+        self.mismatch = "{}: {}".format(self._recording.name, message)
+        log.error(self.mismatch)
+        raise ReplayMismatchError(self.mismatch)
+
+
+class WebDriverTransport:
+    """
+    Record webdriver sessions to files or replay them offline, live mode leaves drivers untouched
+    """
+
+    def __init__(self):
+        """
+        Constructor webdriver transport
+        """
+        self.mode = "live"
+        self.recording = None
+        self.connection = None
+
+    def configure(self, config):
+        """
+        Apply run configuration
+        :param config: RunConfig
+        """
+        self.mode = config.webdriver_transport
+
+    @property
+    def is_replay(self):
+        """
+        Check if sessions are replayed from recordings
+        :return: boolean
+        """
+        return self.mode == "replay"
+
+    def start_test(self, name):
+        """
+        Start recording or replaying the session of a test
+        :param name: test node id
+        """
+        self.connection = None
+        if self.mode == "record":
+            self.recording = Recording(name)
+        elif self.mode == "replay":
+            self.recording = Recording.load(name)
+
+    def replay_driver(self):
+        """
+        Create driver answered by the recording of the current test
+        :return: webdriver object
+        """
+        self.connection = ReplayConnection(self.recording)
+        return webdriver.Remote(
+            command_executor=self.connection, options=webdriver.ChromeOptions()
+        )
+
+    def attach(self, driver):
+        """
+        Record commands of a new live driver when recording
+        :param driver: webdriver object
+        :return: same webdriver object
+        """
+        if self.mode == "record":
+            self.recording.add(
+                Command.NEW_SESSION,
+                {},
+                {"value": {"sessionId": driver.session_id, "capabilities": driver.caps}},
+            )
+            driver.command_executor = RecordingConnection(driver.command_executor, self.recording)
+        return driver
+
+    def finish_test(self):
+        """
+        Save recording or check the whole recording was replayed
+        """
+        recording, connection, self.recording = self.recording, self.connection, None
+        if self.mode == "record" and recording:
+            recording.save()
+        elif self.mode == "replay" and connection and not connection.mismatch:
+            pending = connection.pending
+            if pending:
+                connection.flag(
+                    "{} recorded commands were not replayed, next is {}".format(
+                        len(pending), pending[0]["command"]
+                    )
+                )
+
+
+transport = WebDriverTransport()
@@ -1,7 +1,5 @@
-import os
-from base64 import b64decode
-from pathlib import Path
-from typing import Union
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
 
 import allure
 import selenium.common.exceptions as exc
@@ -10,12 +8,74 @@ from loguru import logger as log
 from selenium.webdriver import ActionChains
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.wait import WebDriverWait
 
-from utils.common import get_current_time, get_env, get_env_browser, get_env_var
-from utils.constants import BASE_DIR, MEDIUM_WAIT_TIME, NO_WAIT, WindowSize
+from utils.constants import MEDIUM_WAIT_TIME, NO_WAIT, WindowSize
+from utils.metrics import instrument
+from utils.run_config import get_run_config
+from utils.screenshot import screenshots
+from web.locators import locators
+from web.readiness import ReadinessStrategy, navigate
+from web.scripts import READ_ELEMENTS
+from web.waits import TimedWait, WaitEngine, get_wait_strategy, is_native_context
 
 
+@dataclass
+class ElementRecord:
+    """
+    Plain record with the state of an element read in a single round trip
+    """
+
+    element: Optional[WebElement]
+    text: str
+    displayed: bool
+    attributes: Dict[str, Optional[str]] = field(default_factory=dict)
+    children: Dict[str, Optional["ElementRecord"]] = field(default_factory=dict)
+
+    @classmethod
+    def from_script(cls, raw):
+        """
+        Build record from execute_script result
+        :param raw: dict returned by the read elements script
+        :return: element record
+        """
+        children = {
+            name: cls.from_script(child) if child else None
+            for name, child in raw.get("children", {}).items()
+        }
+        return cls(raw["element"], raw["text"], raw["displayed"], raw["attributes"], children)
+
+    @classmethod
+    def from_element(cls, element, attributes=(), children=None):
+        """
+        Build record with webdriver commands, for contexts that can not run scripts
+        :param element: web element
+        :param attributes: attribute names to read on the element and its children
+        :param children: dict with child name and locator searched inside the element
+        :return: element record
+        """
+        displayed = element.is_displayed()
+        record = cls(
+            element,
+            element.text.strip() if displayed else "",
+            displayed,
+            {name: element.get_attribute(name) for name in attributes},
+        )
+        for name, locator in (children or {}).items():
+            found = element.find_elements(*locator)
+            record.children[name] = cls.from_element(found[0], attributes) if found else None
+        return record
+
+
+@instrument(
+    exclude=(
+        "_get_wait",
+        "_get_wait_engine",
+        "_get_locator_by_os",
+        "is_responsive",
+        "get_locator_by_size",
+        "get_locator_by_env",
+    )
+)
 class BaseScreen:
     """
     BaseScreen class
@@ -23,6 +83,8 @@ class BaseScreen:
 
     _driver = None
     _wait_time = MEDIUM_WAIT_TIME
+    # page objects declare a ReadinessStrategy, None uses the READINESS default
+    readiness: Optional[ReadinessStrategy] = None
 
     def _get_wait(self, wait_time=_wait_time):
         """
@@ -30,10 +92,18 @@ class BaseScreen:
         :param wait_time: wait default time
         :return: webDriverWait
         """
-        return WebDriverWait(
+        return TimedWait(
             self._driver, wait_time, ignored_exceptions=[exc.ElementNotVisibleException]
         )
 
+    def _get_wait_engine(self):
+        """
+        Get event driven wait engine for current driver
+        :return: WaitEngine or None when WAIT_STRATEGY is webdriver
+        """
+        strategy = get_wait_strategy(self._driver)
+        return None if strategy == "webdriver" else WaitEngine(self._driver, strategy)
+
     @staticmethod
     def _get_locator_by_os(locator_info):
         """
@@ -41,9 +111,7 @@ class BaseScreen:
         :param locator_info: dict or tuple with locator info
         :return: locator tuple
         """
-        if isinstance(locator_info, dict):
-            return locator_info.get(get_env_var("EXECUTE_ON").lower())
-        return locator_info
+        return locators.by_os(locator_info)
 
     def _tap_on_element(self, locator_info, timeout=_wait_time):
         """
@@ -85,6 +153,12 @@ class BaseScreen:
          :param wait: Amount of time to wait (in seconds).
          :return: The element once it is located.
         """
+        engine = self._get_wait_engine()
+        if engine:
+            element = engine.until_present(locator, wait)
+            if element is None:
+                log.error("Element {} not found after {} seconds".format(locator[1], wait))
+            return element
         try:
             return self._get_wait(wait).until(ec.presence_of_element_located(locator))
         except (exc.TimeoutException, exc.NoSuchElementException) as ex:
@@ -128,6 +202,11 @@ class BaseScreen:
          :param wait: Amount of time to wait (in seconds). wait time
         """
         log.info("Wait for element {} to disappear".format(locator))
+        engine = self._get_wait_engine()
+        if engine:
+            if engine.until_invisible(locator, wait):
+                log.info("Element is not present anymore")
+            return
         try:
             element = self._get_element(locator, NO_WAIT) if type(locator) == tuple else locator
             self._get_wait(wait).until(ec.invisibility_of_element(element))
@@ -144,9 +223,7 @@ class BaseScreen:
         try:
             if type(locator) == tuple:
                 log.info("Click on element {}".format(locator[1]))
-                element = WebDriverWait(self._driver, wait).until(
-                    ec.element_to_be_clickable(locator)
-                )
+                element = TimedWait(self._driver, wait).until(ec.element_to_be_clickable(locator))
             else:
                 log.info("Click on element")
                 element = locator
@@ -198,8 +275,14 @@ class BaseScreen:
         :return: Boolean value.
         """
         locator_name = ""
+        engine = self._get_wait_engine()
         try:
-            if type(locator) == tuple:
+            if type(locator) == tuple and engine:
+                locator_name = locator[1]
+                element = engine.until_visible(locator, wait)
+                if element is None:
+                    raise exc.TimeoutException()
+            elif type(locator) == tuple:
                 locator_name = locator[1]
                 element = self._get_wait(wait).until(ec.visibility_of_element_located(locator))
             else:
@@ -228,7 +311,27 @@ class BaseScreen:
         This function refreshes the current page.
         """
         log.info("Refresh the page")
-        self._driver.refresh()
+        navigate(self._driver, self._driver.refresh, readiness=self.readiness)
+
+    @allure.step("Set window size")
+    def _set_window_size(self, width, height):
+        """
+        Set browser window size, locators depending on the viewport are resolved again
+        :param width: window width
+        :param height: window height
+        """
+        log.info("Set window size {}x{}".format(width, height))
+        self._driver.set_window_size(width, height)
+        locators.invalidate_viewport()
+
+    @allure.step("Maximize window")
+    def _maximize_window(self):
+        """
+        Maximize browser window, locators depending on the viewport are resolved again
+        """
+        log.info("Maximize window")
+        self._driver.maximize_window()
+        locators.invalidate_viewport()
 
     @allure.step("Move to an element")
     def _move_to_element(self, locator, wait=_wait_time):
@@ -287,7 +390,7 @@ class BaseScreen:
     @allure.step("Get the page")
     def _get_the_page(self, web_site):
         """This method gets the url to get it"""
-        self._driver.get(web_site)
+        navigate(self._driver, self._driver.get, web_site, readiness=self.readiness)
 
     @allure.step("Check if text is in element")
     def _is_text_in_element(self, locator, text, wait=_wait_time):
@@ -304,21 +407,12 @@ class BaseScreen:
         except AttributeError:
             return False
 
-    def take_screenshot(self):
+    def take_screenshot(self, final=False):
         """
-        Take screenshot for allure and local
+        Take screenshot for allure and local, saved in background until teardown flush
+        :param final: true for the screenshot of the final test failure
         """
-        if eval(get_env_var("SCREENSHOT", "True")):
-            file_dir = os.path.join(BASE_DIR, "output")
-            date_time = get_current_time()
-            full_file = Path(os.path.join(file_dir, "{}.png".format(date_time)))
-            if not os.path.exists(file_dir):
-                os.mkdir(file_dir)
-            png = b64decode(self._driver.get_screenshot_as_base64().encode("ascii"))
-            with open(full_file, "wb") as f:
-                f.write(png)
-            allure.attach.file(full_file)
-            log.warning("Screenshot taken placed in {}".format(full_file))
+        screenshots.capture(self._driver, final=final)
 
     @allure.step("Get element by text on list of elements")
     def _get_element_on_list_by_text(self, locator, text):
@@ -329,13 +423,35 @@ class BaseScreen:
         :return: element found
         """
         log.info("Get element by text on list of elements")
+        for record in self._read_elements(locator):
+            if record.text == text:
+                return record.element
+        raise IndexError("{} was not found in list".format(text))
 
+    def _read_elements(self, locator, attributes=(), children=None, wait=_wait_time):
+        """
+        Read text, visibility, attributes and children of every element matching a locator,
+        all in a single execute_script call. Native mobile contexts read them element by element
+        :param locator: An element given a By strategy and locator. tuple
+        :param attributes: attribute names to read on each element and child
+        :param children: dict with child name and locator searched inside each element
+        :param wait: Amount of time to wait (in seconds) for at least one element
+        :return: list of element records, empty if no element was found
+        """
+        if is_native_context(self._driver):
+            elements = self._get_elements(locator, wait) or []
+            return [
+                ElementRecord.from_element(element, attributes, children) for element in elements
+            ]
+        args = [list(locator), list(attributes), {k: list(v) for k, v in (children or {}).items()}]
         try:
-            elem_list = list(filter(lambda x: x.text == text, self._get_elements(locator)))
-            return elem_list[0]
-        except IndexError:
-            pass
-        raise IndexError("{} was not found in list".format(text))
+            raw_list = self._get_wait(wait).until(
+                lambda driver: driver.execute_script(READ_ELEMENTS, *args)
+            )
+        except exc.TimeoutException:
+            log.error("Elements {} were not found".format(locator[1]))
+            return []
+        return [ElementRecord.from_script(raw) for raw in raw_list]
 
     @allure.step("Get element attribute")
     def _get_attribute(self, locator, attr):
@@ -360,7 +476,7 @@ class BaseScreen:
         """
         log.info("Get Shadow element")
         shadow_host = self._get_element(shadow, wait)
-        if get_env_browser() == "firefox":
+        if get_run_config().browser == "firefox":
             return self._driver.execute_script(
                 "return arguments[0].shadowRoot.children", shadow_host
             )
@@ -376,7 +492,7 @@ class BaseScreen:
         Check if execution is responsive
         :return: true if is not desktop size
         """
-        return self._driver.get_window_size()["width"] != WindowSize.desktop.value
+        return locators.get_size_name(self._driver) != WindowSize.desktop.name
 
     def get_locator_by_size(self, locator):
         """
@@ -384,13 +500,7 @@ class BaseScreen:
         :param locator: locator info can be dict or  tuple
         :return: tuple with locator
         """
-        if type(locator) == dict:
-            if self.is_responsive():
-                return locator.get(WindowSize.tablet.name)
-            else:
-                return locator.get(WindowSize.desktop.name)
-        else:
-            return locator
+        return locators.by_size(locator, self._driver)
 
     @staticmethod
     def get_locator_by_env(locator):
@@ -399,14 +509,7 @@ class BaseScreen:
         :param locator: locator info can be dict or  tuple
         :return: tuple with locator
         """
-        env = get_env()
-        if type(locator) == dict:
-            if env in locator:
-                return locator.get(env)
-            else:
-                return locator.get("default")
-        else:
-            return locator
+        return locators.by_env(locator)
 
     def _get_text(self, locator_info):
         """
@@ -0,0 +1,89 @@
+from utils.constants import WindowSize
+from utils.run_config import get_run_config
+
+SIZE_KEYS = {WindowSize.desktop.name, WindowSize.tablet.name}
+
+
+class LocatorRegistry:
+    """
+    Resolve responsive, OS and environment variants of dict locators, the viewport they depend
+    on is requested once per webdriver session or window size change
+    """
+
+    def __init__(self):
+        """
+        Constructor locator registry
+        """
+        self._viewport = (None, None)
+
+    def get_size_name(self, driver):
+        """
+        Get viewport name, the window size is requested once per webdriver session
+        :param driver: webdriver object
+        :return: desktop or tablet
+        """
+        session_id, size_name = self._viewport
+        if session_id != driver.session_id or size_name is None:
+            width = driver.get_window_size()["width"]
+            size_name = (
+                WindowSize.desktop.name
+                if width == WindowSize.desktop.value
+                else WindowSize.tablet.name
+            )
+            self._viewport = (driver.session_id, size_name)
+        return size_name
+
+    def invalidate_viewport(self):
+        """
+        Forget cached viewport, call it after changing the window size
+        """
+        self._viewport = (None, None)
+
+    def get_os(self):
+        """
+        Get mobile OS of the execution
+        :return: string with os name
+        """
+        return get_run_config().execute_on
+
+    def get_env(self):
+        """
+        Get environment of the execution
+        :return: string with env name
+        """
+        return get_run_config().env
+
+    def by_size(self, locator, driver):
+        """
+        Get locator for current viewport
+        :param locator: locator info can be dict or tuple
+        :param driver: webdriver object
+        :return: tuple with locator
+        """
+        if not isinstance(locator, dict):
+            return locator
+        return locator.get(self.get_size_name(driver))
+
+    def by_os(self, locator):
+        """
+        Get locator for current mobile OS
+        :param locator: locator info can be dict or tuple
+        :return: tuple with locator
+        """
+        if not isinstance(locator, dict):
+            return locator
+        return locator.get(self.get_os())
+
+    def by_env(self, locator):
+        """
+        Get locator for current environment or default one
+        :param locator: locator info can be dict or tuple
+        :return: tuple with locator
+        """
+        if not isinstance(locator, dict):
+            return locator
+        env = self.get_env()
+        return locator.get(env, locator.get("default"))
+
+
+locators = LocatorRegistry()
@@ -1,5 +1,6 @@
 from utils.constants import CSS
 from web.base_screen import BaseScreen
+from web.readiness import SentinelLocator
 
 
 class JobsPage(BaseScreen):
@@ -11,6 +12,7 @@ class JobsPage(BaseScreen):
     _find_jobs_btn = (CSS, "button.c-search-submit")
     _address_text = (CSS, ".qa-store-address")
     _jobs_list = (CSS, ".qa-job-container")
+    readiness = SentinelLocator(_search_bar_input)
 
     def search_position(self, position):
         """
@@ -39,10 +41,13 @@ class JobsPage(BaseScreen):
         Are address present on list of jobs
         :return: true if list is correct
         """
-        jobs_list = self._get_elements(self._jobs_list, 10)
+        jobs_list = self._read_elements(
+            self._jobs_list, children={"address": self._address_text}, wait=10
+        )
+        if not jobs_list:
+            return False
         flags = []
         for job in jobs_list:
-            address_element = self._get_element_inside_of_element(job, self._address_text)
-            print(address_element.text)
-            flags.append(address_element.is_displayed())
+            address = job.children["address"]
+            flags.append(bool(address and address.displayed))
         return all(flags)
@@ -0,0 +1,264 @@
+import time
+from abc import ABC, abstractmethod
+
+import selenium.common.exceptions as exc
+from loguru import logger as log
+from selenium.webdriver.support import expected_conditions as ec
+
+from utils.browser_profile import page_loads
+from utils.constants import MEDIUM_WAIT_TIME, NETWORK_IDLE_TIME
+from utils.run_config import get_run_config
+from web.scripts import IS_READY, NETWORK_COUNTER, WAIT_FOR_READY
+from web.waits import (
+    TimedWait,
+    WaitEngine,
+    get_wait_strategy,
+    poll_until,
+    set_script_timeout,
+)
+
+
+def wait_for_check(driver, check, value, timeout):
+    """
+    Wait until an in-page readiness check passes, the check loops inside the page with the event
+    strategy and is polled from here otherwise
+    :param driver: webdriver object
+    :param check: readyState or networkIdle
+    :param value: check argument
+    :param timeout: Amount of time to wait (in seconds).
+    :return: true if the check passed
+    """
+    start = time.monotonic()
+    if get_wait_strategy(driver) == "event":
+        try:
+            set_script_timeout(driver, timeout)
+            return bool(
+                driver.execute_async_script(WAIT_FOR_READY, check, value, int(timeout * 1000))
+            )
+        except exc.WebDriverException as error:
+            log.debug("Readiness script failed, polling instead: {}".format(error.msg))
+    remaining = max(timeout - (time.monotonic() - start), 0)
+    return bool(poll_until(lambda: driver.execute_script(IS_READY, check, value), remaining))
+
+
+class ReadinessStrategy(ABC):
+    """
+    Decide when a page is ready after a navigation
+    """
+
+    def prepare(self, driver):
+        """
+        Called before navigation
+        :param driver: webdriver object
+        """
+
+    @abstractmethod
+    def is_ready(self, driver, timeout):
+        """
+        Wait until page is ready
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+
+    def wait(self, driver, timeout=MEDIUM_WAIT_TIME):
+        """
+        Wait until page is ready, a page that is not ready on time is logged and tests go on
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+        ready = self.is_ready(driver, timeout)
+        if not ready:
+            log.warning("Page is not ready after {} seconds: {}".format(timeout, self))
+        return ready
+
+    def __repr__(self):
+        """
+        Readable strategy
+        :return: string
+        """
+        return type(self).__name__
+
+
+class ReadyState(ReadinessStrategy):
+    """
+    Page is ready once document.readyState reaches one of the given states
+    """
+
+    def __init__(self, states=("interactive", "complete")):
+        """
+        Constructor ready state
+        :param states: accepted document.readyState values
+        """
+        self.states = list(states)
+
+    def is_ready(self, driver, timeout):
+        """
+        Wait until document.readyState is accepted
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+        return wait_for_check(driver, "readyState", self.states, timeout)
+
+
+class NetworkIdle(ReadinessStrategy):
+    """
+    Page is ready when there are no fetch or XHR requests in flight for a while. The request
+    counter is added to every new document through CDP when the browser allows it, otherwise it
+    is injected after navigation and requests started before are not counted
+    """
+
+    def __init__(self, idle=NETWORK_IDLE_TIME):
+        """
+        Constructor network idle
+        :param idle: seconds without requests in flight
+        """
+        self.idle = idle
+
+    def prepare(self, driver):
+        """
+        Add request counter to new documents of chrome sessions, once per session
+        :param driver: webdriver object
+        """
+        if getattr(driver, "_network_counter_installed", False):
+            return
+        try:
+            driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_COUNTER}
+            )
+        except (AttributeError, exc.WebDriverException) as error:
+            log.trace(error)
+        driver._network_counter_installed = True
+
+    def is_ready(self, driver, timeout):
+        """
+        Wait until there are no requests in flight for idle seconds
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+        driver.execute_script(NETWORK_COUNTER)
+        return wait_for_check(driver, "networkIdle", int(self.idle * 1000), timeout)
+
+
+class SentinelLocator(ReadinessStrategy):
+    """
+    Page is ready when an element that is rendered last is displayed
+    """
+
+    def __init__(self, locator, visible=True):
+        """
+        Constructor sentinel locator
+        :param locator: An element given a By strategy and locator.
+        :param visible: wait for element to be displayed, or only present on the DOM
+        """
+        self.locator = locator
+        self.visible = visible
+
+    def is_ready(self, driver, timeout):
+        """
+        Wait until sentinel element is displayed or present
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+        strategy = get_wait_strategy(driver)
+        if strategy != "webdriver":
+            engine = WaitEngine(driver, strategy)
+            wait = engine.until_visible if self.visible else engine.until_present
+            return wait(self.locator, timeout) is not None
+        condition = (
+            ec.visibility_of_element_located if self.visible else ec.presence_of_element_located
+        )
+        try:
+            return bool(TimedWait(driver, timeout).until(condition(self.locator)))
+        except exc.TimeoutException:
+            return False
+
+    def __repr__(self):
+        """
+        Readable strategy
+        :return: string
+        """
+        return "SentinelLocator({})".format(self.locator[1])
+
+
+class AllOf(ReadinessStrategy):
+    """
+    Page is ready when every strategy says so, checked in order within the same timeout
+    """
+
+    def __init__(self, *strategies):
+        """
+        Constructor all of
+        :param strategies: readiness strategies
+        """
+        self.strategies = strategies
+
+    def prepare(self, driver):
+        """
+        Prepare every strategy
+        :param driver: webdriver object
+        """
+        for strategy in self.strategies:
+            strategy.prepare(driver)
+
+    def is_ready(self, driver, timeout):
+        """
+        Wait until every strategy is ready
+        :param driver: webdriver object
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if page is ready
+        """
+        end = time.monotonic() + timeout
+        return all(
+            strategy.is_ready(driver, max(end - time.monotonic(), 0))
+            for strategy in self.strategies
+        )
+
+    def __repr__(self):
+        """
+        Readable strategy
+        :return: string
+        """
+        return "AllOf({})".format(", ".join(repr(strategy) for strategy in self.strategies))
+
+
+def get_default_readiness():
+    """
+    Get readiness strategy of pages that do not declare one
+    :return: ReadinessStrategy, or None to rely on the page load strategy only
+    """
+    readiness = get_run_config().readiness
+    if readiness == "ready_state":
+        return ReadyState()
+    if readiness == "network_idle":
+        return NetworkIdle()
+    return None
+
+
+def navigate(driver, navigation, *args, readiness=None):
+    """
+    Run a navigation command and return once the page is ready, the whole time is recorded on
+    the page load report
+    :param driver: webdriver object
+    :param navigation: callable like driver.get or driver.refresh
+    :param args: navigation arguments
+    :param readiness: ReadinessStrategy, the default one when None
+    :return: true if page is ready
+    """
+    readiness = readiness or get_default_readiness()
+    if readiness:
+        readiness.prepare(driver)
+
+    def load():
+        """
+        Navigate and wait for readiness
+        :return: true if page is ready
+        """
+        navigation(*args)
+        return readiness.wait(driver) if readiness else True
+
+    return page_loads.navigate(load)
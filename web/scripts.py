@@ -0,0 +1,151 @@
+FIND_ALL = """
+function findAll(by, value, root) {
+    root = root || document;
+    if (by === 'xpath') {
+        var snapshot = document.evaluate(
+            value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+        return nodes;
+    }
+    if (by === 'link text' || by === 'partial link text') {
+        return Array.prototype.filter.call(root.querySelectorAll('a'), function (link) {
+            var text = link.innerText.trim();
+            return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+        });
+    }
+    var selectors = {
+        'id': '#' + CSS.escape(value),
+        'name': '[name="' + CSS.escape(value) + '"]',
+        'class name': '.' + CSS.escape(value),
+        'tag name': value,
+        'css selector': value
+    };
+    if (!Object.prototype.hasOwnProperty.call(selectors, by)) {
+        throw new Error('Unsupported locator strategy for scripts: ' + by);
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(selectors[by]));
+}
+"""
+
+IS_DISPLAYED = """
+function isDisplayed(element) {
+    if (!element.isConnected) return false;
+    var style = window.getComputedStyle(element);
+    if (style.visibility === 'hidden' || style.visibility === 'collapse') return false;
+    if (parseFloat(style.opacity) === 0) return false;
+    return element.getClientRects().length > 0 &&
+        (element.offsetWidth > 0 || element.offsetHeight > 0 || element.getBBox !== undefined);
+}
+"""
+
+READ_ELEMENTS = FIND_ALL + IS_DISPLAYED + """
+function read(element, attributes) {
+    var displayed = isDisplayed(element);
+    var record = {
+        element: element,
+        text: displayed ? element.innerText.trim() : '',
+        displayed: displayed,
+        attributes: {}
+    };
+    attributes.forEach(function (name) { record.attributes[name] = element.getAttribute(name); });
+    return record;
+}
+var locator = arguments[0], attributes = arguments[1], children = arguments[2];
+return findAll(locator[0], locator[1]).map(function (element) {
+    var record = read(element, attributes);
+    record.children = {};
+    Object.keys(children).forEach(function (name) {
+        var child = findAll(children[name][0], children[name][1], element)[0];
+        record.children[name] = child ? read(child, attributes) : null;
+    });
+    return record;
+});
+"""
+
+WAIT_FOR_CONDITION = FIND_ALL + IS_DISPLAYED + """
+var condition = arguments[0], locator = arguments[1], target = arguments[2];
+var timeout = arguments[3], done = arguments[arguments.length - 1];
+function check() {
+    if (condition === 'invisible') {
+        var element = target || (locator && findAll(locator[0], locator[1])[0]);
+        return !element || !isDisplayed(element) ? true : null;
+    }
+    var first = findAll(locator[0], locator[1])[0];
+    if (!first) return null;
+    return condition === 'visible' && !isDisplayed(first) ? null : first;
+}
+var result = check();
+if (result !== null || timeout <= 0) {
+    done(result);
+} else {
+    var observer, interval, timer;
+    var finish = function (value) {
+        observer.disconnect();
+        clearInterval(interval);
+        clearTimeout(timer);
+        done(value);
+    };
+    var onChange = function () {
+        var value = check();
+        if (value !== null) finish(value);
+    };
+    observer = new MutationObserver(onChange);
+    observer.observe(
+        document, {childList: true, subtree: true, attributes: true, characterData: true});
+    interval = setInterval(onChange, 100);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
+"""
+
+NETWORK_COUNTER = """
+(function () {
+    if (window.__uafNetwork) return;
+    var state = window.__uafNetwork = {inflight: 0, last: Date.now()};
+    var start = function () { state.inflight++; state.last = Date.now(); };
+    var end = function () {
+        state.inflight = Math.max(state.inflight - 1, 0);
+        state.last = Date.now();
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            start();
+            return fetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; });
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener('loadend', end);
+        return send.apply(this, arguments);
+    };
+})();
+"""
+
+READY_CHECKS = """
+var checks = {
+    readyState: function (states) { return states.indexOf(document.readyState) !== -1; },
+    networkIdle: function (idle) {
+        var state = window.__uafNetwork;
+        return document.readyState !== 'loading' && !!state && state.inflight === 0 &&
+            Date.now() - state.last >= idle;
+    }
+};
+"""
+
+IS_READY = READY_CHECKS + """
+return checks[arguments[0]](arguments[1]);
+"""
+
+WAIT_FOR_READY = READY_CHECKS + """
+var check = arguments[0], value = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1], start = Date.now();
+(function poll() {
+    if (checks[check](value)) return done(true);
+    if (Date.now() - start >= timeout) return done(false);
+    setTimeout(poll, 25);
+})();
+"""
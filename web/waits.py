@@ -0,0 +1,218 @@
+import time
+
+import selenium.common.exceptions as exc
+from loguru import logger as log
+from selenium.webdriver.support.wait import WebDriverWait
+
+from utils.constants import POLL_MAX_INTERVAL, POLL_MIN_INTERVAL, SCRIPT_TIMEOUT_MARGIN
+from utils.metrics import metrics
+from utils.run_config import get_run_config
+from web.scripts import WAIT_FOR_CONDITION
+
+PRESENT = "present"
+VISIBLE = "visible"
+INVISIBLE = "invisible"
+
+
+def is_native_context(driver):
+    """
+    Check if driver runs a native mobile context, they have no browser and can not run scripts
+    :param driver: webdriver object
+    :return: true if session has no browserName
+    """
+    return not driver.capabilities.get("browserName")
+
+
+def get_wait_strategy(driver):
+    """
+    Get wait strategy for driver, native mobile contexts can not run scripts so they poll
+    :param driver: webdriver object
+    :return: event, poll or webdriver
+    """
+    strategy = get_run_config().wait_strategy
+    if strategy == "event" and is_native_context(driver):
+        return "poll"
+    return strategy
+
+
+def poll_until(predicate, timeout):
+    """
+    Poll predicate with adaptive backoff until it returns a truthy value or time is over
+    :param predicate: callable without arguments
+    :param timeout: seconds to wait
+    :return: predicate value or None on timeout
+    """
+    end = time.monotonic() + timeout
+    interval = POLL_MIN_INTERVAL
+    while True:
+        try:
+            value = predicate()
+            if value:
+                return value
+        except (exc.NoSuchElementException, exc.StaleElementReferenceException) as error:
+            log.trace(error)
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, POLL_MAX_INTERVAL)
+
+
+def set_script_timeout(driver, timeout):
+    """
+    Make async script timeout longer than the wait, set only when it changes
+    :param driver: webdriver object
+    :param timeout: Amount of time to wait (in seconds).
+    """
+    script_timeout = timeout + SCRIPT_TIMEOUT_MARGIN
+    if getattr(driver, "_event_wait_script_timeout", None) != script_timeout:
+        driver.set_script_timeout(script_timeout)
+        driver._event_wait_script_timeout = script_timeout
+
+
+class TimedWait(WebDriverWait):
+    """
+    WebDriverWait that reports the time spent waiting to the running metrics steps
+    """
+
+    def until(self, method, message=""):
+        """
+        Wait until method returns a truthy value
+        :param method: expected condition
+        :param message: timeout message
+        :return: method value
+        """
+        with metrics.waiting():
+            return super().until(method, message)
+
+    def until_not(self, method, message=""):
+        """
+        Wait until method returns a falsy value
+        :param method: expected condition
+        :param message: timeout message
+        :return: method value
+        """
+        with metrics.waiting():
+            return super().until_not(method, message)
+
+
+class WaitEngine:
+    """
+    Wait engine that resolves conditions inside the page with a MutationObserver and falls back
+    to adaptive polling when scripts are not available
+    """
+
+    def __init__(self, driver, strategy="event"):
+        """
+        Constructor wait engine
+        :param driver: webdriver object
+        :param strategy: event or poll
+        """
+        self._driver = driver
+        self.strategy = strategy
+
+    def until_present(self, locator, timeout):
+        """
+        Wait until an element is present on the DOM
+        :param locator: An element given a By strategy and locator.
+        :param timeout: Amount of time to wait (in seconds).
+        :return: element or None on timeout
+        """
+        return self._until(PRESENT, locator, None, timeout, self._poll_present)
+
+    def until_visible(self, locator, timeout):
+        """
+        Wait until the first element matching the locator is displayed
+        :param locator: An element given a By strategy and locator.
+        :param timeout: Amount of time to wait (in seconds).
+        :return: element or None on timeout
+        """
+        return self._until(VISIBLE, locator, None, timeout, self._poll_visible)
+
+    def until_invisible(self, locator, timeout):
+        """
+        Wait until an element is not displayed or not present anymore
+        :param locator: An element given a By strategy and locator or a WebElement
+        :param timeout: Amount of time to wait (in seconds).
+        :return: true if element disappeared
+        """
+        element = None if isinstance(locator, tuple) else locator
+        locator = locator if isinstance(locator, tuple) else None
+        return bool(self._until(INVISIBLE, locator, element, timeout, self._poll_invisible))
+
+    def _until(self, condition, locator, element, timeout, poll):
+        """
+        Run condition with event strategy and fall back to polling if script fails
+        :param condition: present, visible or invisible
+        :param locator: locator tuple or None
+        :param element: WebElement or None
+        :param timeout: Amount of time to wait (in seconds).
+        :param poll: polling predicate factory
+        :return: condition value or None on timeout
+        """
+        with metrics.waiting():
+            start = time.monotonic()
+            if self.strategy == "event":
+                try:
+                    set_script_timeout(self._driver, timeout)
+                    return self._driver.execute_async_script(
+                        WAIT_FOR_CONDITION,
+                        condition,
+                        list(locator) if locator else None,
+                        element,
+                        int(timeout * 1000),
+                    )
+                except (exc.JavascriptException, exc.TimeoutException) as error:
+                    log.debug("Event wait failed, polling instead: {}".format(error.msg))
+                except exc.StaleElementReferenceException:
+                    return True if condition == INVISIBLE else None
+            remaining = max(timeout - (time.monotonic() - start), 0)
+            return poll_until(poll(locator, element), remaining)
+
+    def _poll_present(self, locator, element):
+        """
+        Polling predicate for present condition
+        :param locator: locator tuple
+        :param element: not used
+        :return: predicate
+        """
+        return lambda: next(iter(self._driver.find_elements(*locator)), None)
+
+    def _poll_visible(self, locator, element):
+        """
+        Polling predicate for visible condition
+        :param locator: locator tuple
+        :param element: not used
+        :return: predicate
+        """
+
+        def predicate():
+            """
+            Get element if it is displayed
+            :return: element or None
+            """
+            found = self._driver.find_element(*locator)
+            return found if found.is_displayed() else None
+
+        return predicate
+
+    def _poll_invisible(self, locator, element):
+        """
+        Polling predicate for invisible condition
+        :param locator: locator tuple or None
+        :param element: WebElement or None
+        :return: predicate
+        """
+
+        def predicate():
+            """
+            Check if element is not displayed or not present
+            :return: boolean
+            """
+            try:
+                found = element or self._driver.find_element(*locator)
+                return not found.is_displayed()
+            except (exc.NoSuchElementException, exc.StaleElementReferenceException):
+                return True
+
+        return predicate